@@ -0,0 +1,103 @@
+import json
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from posts.models import Group, Post
+from posts.tests.test_views import OVERFLOW_CURSORS
+
+User = get_user_model()
+
+
+class PostApiTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username='auth', first_name='Лев', last_name='Толстой')
+        cls.group = Group.objects.create(title='Котики', slug='cats')
+        for index in range(25):
+            Post.objects.create(
+                text=f'Пост {index}', author=cls.user,
+                group=cls.group if index % 2 else None)
+
+    def get_json(self, url, queries, **params):
+        """Читает ответ целиком в рамках бюджета запросов к базе."""
+        with self.assertNumQueries(queries):
+            response = self.client.get(url, params)
+            content = (b''.join(response.streaming_content)
+                       if response.streaming else response.content)
+        return response, json.loads(content.decode())
+
+    def test_feed_pages_by_cursor(self):
+        """Лента отдаётся страницами по курсору без пропусков и повторов."""
+        url = reverse('api:post_list')
+        response, data = self.get_json(url, 1, limit=10)
+        self.assertTrue(response.streaming)
+        ids = [post['id'] for post in data['results']]
+        while data['next']:
+            response, data = self.get_json(data['next'], 1)
+            ids += [post['id'] for post in data['results']]
+        self.assertEqual(
+            ids, list(Post.objects.values_list('id', flat=True)))
+
+    def test_feed_serializes_columns(self):
+        """Пост в ленте содержит автора и группу по их ключам."""
+        url = reverse('api:group_posts', args=('cats',))
+        _, data = self.get_json(url, 2, limit=1)
+        post = Post.objects.filter(group=self.group).first()
+        self.assertEqual(data['results'], [{
+            'id': post.id,
+            'text': post.text,
+            'pub_date': data['results'][0]['pub_date'],
+            'updated_at': data['results'][0]['updated_at'],
+            'author': 'auth',
+            'group': 'cats',
+        }])
+
+    def test_group_and_author_feeds(self):
+        """Ленты группы и автора содержат только их посты."""
+        feeds = {
+            reverse('api:group_posts', args=('cats',)): 12,
+            reverse('api:author_posts', args=('auth',)): 25,
+        }
+        for url, total in feeds.items():
+            with self.subTest(url=url):
+                _, data = self.get_json(url, 2, limit=100)
+                self.assertEqual(len(data['results']), total)
+                self.assertIsNone(data['next'])
+
+    def test_post_detail(self):
+        """Пост отдаётся одним запросом вместе с именем автора."""
+        post = Post.objects.filter(group=self.group).first()
+        _, data = self.get_json(
+            reverse('api:post_detail', args=(post.id,)), 1)
+        self.assertEqual(data['author_name'], 'Лев Толстой')
+        self.assertEqual(data['group_title'], 'Котики')
+
+    def test_errors(self):
+        """Неизвестные объекты и курсоры дают JSON-ошибки."""
+        urls = {
+            reverse('api:group_posts', args=('dogs',)): HTTPStatus.NOT_FOUND,
+            reverse('api:author_posts', args=('nobody',)):
+                HTTPStatus.NOT_FOUND,
+            reverse('api:post_detail', args=(0,)): HTTPStatus.NOT_FOUND,
+            reverse('api:post_list') + '?cursor=broken':
+                HTTPStatus.BAD_REQUEST,
+            reverse('api:post_list') + '?cursor=' + OVERFLOW_CURSORS[0]:
+                HTTPStatus.BAD_REQUEST,
+            reverse('api:post_list') + '?limit=many': HTTPStatus.BAD_REQUEST,
+        }
+        for url, status in urls.items():
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, status)
+                self.assertIn('detail', response.json())
+
+    def test_read_only(self):
+        """API доступно только на чтение."""
+        response = self.client.post(reverse('api:post_list'))
+        self.assertEqual(
+            response.status_code, HTTPStatus.METHOD_NOT_ALLOWED)
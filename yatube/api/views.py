@@ -0,0 +1,101 @@
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils.http import urlencode
+from django.views.decorators.http import require_GET
+
+from posts.models import Group, Post
+from posts.paginators import InvalidCursor, KeysetPaginator
+
+PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+# Только нужные столбцы: строки сериализуются без экземпляров моделей.
+POST_FIELDS = ('id', 'text', 'pub_date', 'updated_at',
+               'author__username', 'group__slug')
+DETAIL_FIELDS = POST_FIELDS + ('author__first_name', 'author__last_name',
+                               'group__title')
+
+User = get_user_model()
+encoder = DjangoJSONEncoder(ensure_ascii=False)
+
+
+def error(detail, status):
+    return JsonResponse({'detail': detail}, status=status,
+                        json_dumps_params={'ensure_ascii': False})
+
+
+def serialize_post(row):
+    return {
+        'id': row['id'],
+        'text': row['text'],
+        'pub_date': row['pub_date'],
+        'updated_at': row['updated_at'],
+        'author': row['author__username'],
+        'group': row['group__slug'],
+    }
+
+
+def stream_results(request, rows):
+    yield '{"results": ['
+    for index, row in enumerate(rows):
+        yield (', ' if index else '') + encoder.encode(serialize_post(row))
+    next_url = None
+    if rows.next_cursor:
+        next_url = '{}?{}'.format(request.path, urlencode({
+            'cursor': rows.next_cursor,
+            'limit': rows.paginator.per_page,
+        }))
+    yield '], "next": {}}}'.format(encoder.encode(next_url))
+
+
+def post_feed(request, posts):
+    """Страница ленты по курсору потоком JSON."""
+    try:
+        limit = min(max(int(request.GET.get('limit', PAGE_SIZE)), 1),
+                    MAX_PAGE_SIZE)
+    except ValueError:
+        return error('Некорректный limit', HTTPStatus.BAD_REQUEST)
+    paginator = KeysetPaginator(posts.values(*POST_FIELDS), limit)
+    try:
+        rows = paginator.slice_after(request.GET.get('cursor'))
+    except InvalidCursor as exc:
+        return error(str(exc), HTTPStatus.BAD_REQUEST)
+    return StreamingHttpResponse(stream_results(request, rows),
+                                 content_type='application/json')
+
+
+@require_GET
+def post_list(request):
+    return post_feed(request, Post.objects.all())
+
+
+@require_GET
+def group_posts(request, slug):
+    group_id = Group.objects.filter(
+        slug=slug).values_list('pk', flat=True).first()
+    if group_id is None:
+        return error('Группа не найдена', HTTPStatus.NOT_FOUND)
+    return post_feed(request, Post.objects.filter(group_id=group_id))
+
+
+@require_GET
+def author_posts(request, username):
+    author_id = User.objects.filter(
+        username=username).values_list('pk', flat=True).first()
+    if author_id is None:
+        return error('Автор не найден', HTTPStatus.NOT_FOUND)
+    return post_feed(request, Post.objects.filter(author_id=author_id))
+
+
+@require_GET
+def post_detail(request, post_id):
+    row = Post.objects.filter(pk=post_id).values(*DETAIL_FIELDS).first()
+    if row is None:
+        return error('Пост не найден', HTTPStatus.NOT_FOUND)
+    data = serialize_post(row)
+    data['author_name'] = ' '.join(filter(None, (
+        row['author__first_name'], row['author__last_name'])))
+    data['group_title'] = row['group__title']
+    return JsonResponse(data, json_dumps_params={'ensure_ascii': False})
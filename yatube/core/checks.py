@@ -0,0 +1,62 @@
+from django.conf import settings
+from django.core.checks import Warning, register
+from django.template import engines
+from django.template.loaders.cached import Loader as CachedLoader
+
+PERFORMANCE = 'performance'
+# Кеши в памяти процесса: у каждого воркера свои версии лент.
+PER_PROCESS_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+@register(PERFORMANCE)
+def debug_overhead(app_configs, **kwargs):
+    """Предупреждает об отладочных накладных расходах при
+    PERFORMANCE_CHECKS (включено в settings_production)."""
+    if not settings.PERFORMANCE_CHECKS:
+        return []
+    warnings = []
+    if settings.DEBUG:
+        warnings.append(Warning(
+            'DEBUG включён: каждый SQL-запрос сохраняется в памяти.',
+            hint='Уберите YATUBE_DEBUG из окружения.',
+            id='core.W001',
+        ))
+    for engine in engines.all():
+        template_engine = getattr(engine, 'engine', None)
+        if template_engine is None:
+            continue
+        cached = any(isinstance(loader, CachedLoader)
+                     for loader in template_engine.template_loaders)
+        if template_engine.debug or not cached:
+            warnings.append(Warning(
+                f'Шаблоны {engine.name} компилируются на каждый запрос.',
+                hint='Нужны debug=False и django.template.loaders.'
+                     'cached.Loader.',
+                id='core.W002',
+            ))
+    if settings.PROFILING:
+        warnings.append(Warning(
+            'PROFILING включён: каждый запрос замеряется и пишется в лог.',
+            hint='Включайте профилирование только на время разбора.',
+            id='core.W003',
+        ))
+    return warnings
+
+
+@register(PERFORMANCE)
+def per_process_cache(app_configs, **kwargs):
+    """Предупреждает, что кеш по умолчанию не общий для процессов."""
+    if not settings.PERFORMANCE_CHECKS:
+        return []
+    backend = settings.CACHES['default']['BACKEND']
+    if backend not in PER_PROCESS_CACHES:
+        return []
+    return [Warning(
+        f'Кеш по умолчанию ({backend}) не общий для процессов: после '
+        'записи другие воркеры отдают устаревшие ленты.',
+        hint='Задайте YATUBE_CACHE_LOCATION (и YATUBE_CACHE_BACKEND).',
+        id='core.W004',
+    )]
@@ -0,0 +1,226 @@
+import json
+import math
+import time
+from collections import namedtuple
+from importlib import import_module
+from wsgiref.util import setup_testing_defaults
+
+from django.conf import settings
+from django.contrib.auth.tokens import default_token_generator
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.urls import reverse
+from django.utils.encoding import force_bytes
+from django.utils.http import urlencode, urlsafe_base64_encode
+
+from core.middleware import QueryCounter
+from posts.models import AuthorStats, Group
+
+# Маршруты, которые замеряются; каждый именованный URL модуля.
+ROUTE_MODULES = ('posts.urls', 'users.urls', 'about.urls', 'api.urls')
+# Выход из аккаунта сбросил бы сессию для остальных замеров.
+SKIP = {'users:logout'}
+# Ленты с постраничной навигацией замеряются на разной глубине.
+PAGED = {'posts:index', 'posts:group_list', 'posts:profile', 'posts:search'}
+# Разница p95 меньше этой считается шумом, а не регрессией.
+LATENCY_FLOOR_MS = 1
+
+Sample = namedtuple('Sample', 'status location seconds queries size')
+
+
+def percentile(values, percent):
+    ordered = sorted(values)
+    return ordered[max(math.ceil(percent / 100 * len(ordered)) - 1, 0)]
+
+
+class Command(BaseCommand):
+    help = ('Замеряет p50/p95/p99, число SQL-запросов и размер ответа '
+            'каждого именованного URL через WSGI-приложение на заполненной '
+            'базе (см. manage.py seed) и сравнивает с базовой линией.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=30)
+        parser.add_argument('--warmup', type=int, default=3)
+        parser.add_argument(
+            '--pages', default='1,10,100',
+            help='Номера страниц лент через запятую.')
+        parser.add_argument(
+            '--host', help='Заголовок Host; по умолчанию первый из '
+                           'ALLOWED_HOSTS или localhost.')
+        parser.add_argument('--output', help='Куда записать JSON-отчёт.')
+        parser.add_argument(
+            '--baseline', help='JSON-отчёт прошлого прогона для сравнения.')
+        parser.add_argument(
+            '--latency-threshold', type=float, default=0.25,
+            help='Допустимый относительный рост p95.')
+        parser.add_argument(
+            '--queries-threshold', type=int, default=0,
+            help='Допустимый рост числа запросов.')
+        parser.add_argument(
+            '--size-threshold', type=float, default=0.1,
+            help='Допустимый относительный рост размера ответа.')
+
+    def handle(self, *args, **options):
+        from yatube.wsgi import application
+        self.application = application
+        hosts = [host for host in settings.ALLOWED_HOSTS
+                 if not host.startswith(('*', '.'))]
+        self.host = options['host'] or (hosts[0] if hosts else 'localhost')
+        if options['requests'] < 1:
+            raise CommandError('--requests должен быть положительным')
+        try:
+            pages = [int(page) for page in options['pages'].split(',')]
+        except ValueError:
+            raise CommandError('--pages: номера страниц через запятую')
+        author, client = self.login()
+        try:
+            routes = {}
+            for label, path, query in self.cases(author, pages):
+                routes[label] = self.measure(path, query, options)
+        finally:
+            client.logout()
+        report = {
+            'meta': {
+                'requests': options['requests'],
+                'debug': settings.DEBUG,
+                'page_cache': settings.POSTS_PAGE_CACHE,
+            },
+            'routes': routes,
+        }
+        self.print_table(routes)
+        if options['output']:
+            with open(options['output'], 'w') as file:
+                json.dump(report, file, indent=2, sort_keys=True)
+        if options['baseline']:
+            self.check_baseline(routes, options)
+
+    def login(self):
+        stats = AuthorStats.objects.select_related('author').order_by(
+            '-post_count').first()
+        if stats is None or not stats.post_count:
+            raise CommandError('База пуста: сначала запустите manage.py seed')
+        client = Client()
+        client.force_login(stats.author)
+        self.cookie = '{}={}'.format(
+            settings.SESSION_COOKIE_NAME,
+            client.cookies[settings.SESSION_COOKIE_NAME].value,
+        )
+        return stats.author, client
+
+    def url_kwargs(self, author):
+        post = author.posts.first()
+        group = Group.objects.order_by('-post_count').first()
+        return {
+            'slug': group.slug if group else '',
+            'username': author.username,
+            'post_id': post.pk,
+            'uidb64': urlsafe_base64_encode(force_bytes(author.pk)),
+            'token': default_token_generator.make_token(author),
+        }, post.text.split()[0]
+
+    def cases(self, author, pages):
+        """(метка, путь, query string) для каждого маршрута и глубины."""
+        kwargs, word = self.url_kwargs(author)
+        for module in ROUTE_MODULES:
+            urls = import_module(module)
+            for pattern in urls.urlpatterns:
+                name = f'{urls.app_name}:{pattern.name}'
+                if name in SKIP:
+                    continue
+                path = reverse(name, kwargs={
+                    key: kwargs[key] for key in pattern.pattern.converters})
+                query = {'q': word} if name == 'posts:search' else {}
+                if name not in PAGED:
+                    yield name, path, urlencode(query)
+                    continue
+                for page in pages:
+                    yield (f'{name}?page={page}', path,
+                           urlencode({**query, 'page': page}))
+
+    def request(self, path, query, cookie=''):
+        environ = {'PATH_INFO': path, 'QUERY_STRING': query,
+                   'HTTP_HOST': self.host}
+        if cookie:
+            environ['HTTP_COOKIE'] = cookie
+        setup_testing_defaults(environ)
+        status = []
+
+        def start_response(status_line, headers, exc_info=None):
+            status.append(int(status_line.split()[0]))
+            status.append(dict(headers).get('Location', ''))
+
+        counter = QueryCounter()
+        started = time.perf_counter()
+        with connection.execute_wrapper(counter):
+            response = self.application(environ, start_response)
+            try:
+                size = sum(len(chunk) for chunk in response)
+            finally:
+                response.close()
+        seconds = time.perf_counter() - started
+        return Sample(*status, seconds, counter.count, size)
+
+    def measure(self, path, query, options):
+        # Страницы только для вошедших замеряются с сессией автора.
+        probe = self.request(path, query)
+        login_url = reverse(settings.LOGIN_URL)
+        needs_login = probe.status == 302 and probe.location.startswith(
+            login_url)
+        cookie = self.cookie if needs_login else ''
+        for _ in range(options['warmup']):
+            self.request(path, query, cookie)
+        samples = [self.request(path, query, cookie)
+                   for _ in range(options['requests'])]
+        latencies = [sample.seconds * 1000 for sample in samples]
+        return {
+            'status': samples[-1].status,
+            'login': needs_login,
+            'p50_ms': round(percentile(latencies, 50), 3),
+            'p95_ms': round(percentile(latencies, 95), 3),
+            'p99_ms': round(percentile(latencies, 99), 3),
+            'queries': max(sample.queries for sample in samples),
+            'bytes': samples[-1].size,
+        }
+
+    def print_table(self, routes):
+        self.stdout.write(
+            f'{"маршрут":40} {"код":>4} {"p50":>8} {"p95":>8} {"p99":>8} '
+            f'{"SQL":>4} {"байт":>8}')
+        for label, result in routes.items():
+            self.stdout.write(
+                f'{label:40} {result["status"]:>4} {result["p50_ms"]:>8} '
+                f'{result["p95_ms"]:>8} {result["p99_ms"]:>8} '
+                f'{result["queries"]:>4} {result["bytes"]:>8}')
+
+    def check_baseline(self, routes, options):
+        with open(options['baseline']) as file:
+            baseline = json.load(file)['routes']
+        regressions = []
+        for label, base in baseline.items():
+            current = routes.get(label)
+            if current is None:
+                continue
+            regressions += self.regressions(label, base, current, options)
+        if regressions:
+            raise CommandError(
+                'Регрессии относительно базовой линии:\n'
+                + '\n'.join(regressions))
+        self.stdout.write(self.style.SUCCESS('Регрессий нет'))
+
+    @staticmethod
+    def regressions(label, base, current, options):
+        found = []
+        p95_limit = base['p95_ms'] * (1 + options['latency_threshold'])
+        if (current['p95_ms'] > p95_limit
+                and current['p95_ms'] - base['p95_ms'] > LATENCY_FLOOR_MS):
+            found.append(
+                f'{label}: p95 {base["p95_ms"]} -> {current["p95_ms"]} мс')
+        if current['queries'] > base['queries'] + options[
+                'queries_threshold']:
+            found.append(
+                f'{label}: SQL {base["queries"]} -> {current["queries"]}')
+        if current['bytes'] > base['bytes'] * (1 + options['size_threshold']):
+            found.append(
+                f'{label}: размер {base["bytes"]} -> {current["bytes"]}')
+        return found
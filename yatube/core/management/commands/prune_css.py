@@ -0,0 +1,173 @@
+import gzip
+import os
+import re
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.template.utils import get_app_template_dirs
+
+SOURCE = os.path.join('css', 'bootstrap.min.css')
+OUTPUT = os.path.join('css', 'bootstrap.pruned.min.css')
+CLASS_ATTR = re.compile(r'\bclass\s*=\s*(["\'])(.*?)\1', re.S)
+# Классы, которые шаблон передаёт фильтру: {{ field|addclass:'x' }}.
+CLASS_FILTER = re.compile(r'\|\s*addclass\s*:\s*(["\'])(.*?)\1')
+TEMPLATE_TAG = re.compile(r'{%.*?%}|{{.*?}}|{#.*?#}', re.S)
+SELECTOR_CLASS = re.compile(r'\.((?:[\w-]|\\.)+)')
+# Внутри :not() и [атрибут] классы не обязаны быть на странице.
+NEGATION = re.compile(r':not\([^()]*\)|\[[^\]]*\]')
+# Правила внутри этих at-правил фильтруются, остальные at-правила
+# (@keyframes, @font-face) сохраняются целиком.
+NESTED = ('@media', '@supports')
+
+
+def template_classes(directories):
+    """Имена классов из атрибутов class и фильтра addclass шаблонов."""
+    classes = set()
+    for directory in directories:
+        for root, _, files in os.walk(directory):
+            for name in files:
+                if not name.endswith(('.html', '.txt')):
+                    continue
+                with open(os.path.join(root, name), encoding='utf-8') as file:
+                    content = file.read()
+                for pattern in (CLASS_ATTR, CLASS_FILTER):
+                    for _, value in pattern.findall(content):
+                        classes.update(TEMPLATE_TAG.sub(' ', value).split())
+    return classes
+
+
+def _string_end(css, start):
+    # Индекс за закрывающей кавычкой с учётом экранирования.
+    index = start + 1
+    while css[index] != css[start]:
+        index += 2 if css[index] == '\\' else 1
+    return index + 1
+
+
+def _comment(css, start, rules, depth):
+    # Индекс за комментарием; лицензионный /*! на верхнем уровне
+    # сохраняется как отдельное правило.
+    end = css.index('*/', start) + 2
+    if depth == 0 and css.startswith('/*!', start):
+        rules.append((css[start:end], None))
+    return end
+
+
+def split_rules(css):
+    """(заголовок, тело) правил верхнего уровня; у операторов вроде
+    @charset и у сохраняемых комментариев /*! тело None."""
+    rules, start, depth, index, brace = [], 0, 0, 0, 0
+    while index < len(css):
+        char = css[index]
+        if char in '"\'':
+            index = _string_end(css, index)
+            continue
+        if css.startswith('/*', index):
+            index = _comment(css, index, rules, depth)
+            start = index if depth == 0 else start
+            continue
+        if char == '{':
+            brace = index if depth == 0 else brace
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                rules.append((css[start:brace].strip(), css[brace + 1:index]))
+                start = index + 1
+        elif char == ';' and depth == 0:
+            rules.append((css[start:index + 1].strip(), None))
+            start = index + 1
+        index += 1
+    return rules
+
+
+def split_selectors(prelude):
+    selectors, depth, start = [], 0, 0
+    for index, char in enumerate(prelude):
+        depth += {'(': 1, ')': -1}.get(char, 0)
+        if char == ',' and depth == 0:
+            selectors.append(prelude[start:index])
+            start = index + 1
+    return selectors + [prelude[start:]]
+
+
+def selector_used(selector, used):
+    selector = NEGATION.sub('', selector)
+    return all(name.replace('\\', '') in used
+               for name in SELECTOR_CLASS.findall(selector))
+
+
+def prune(css, used):
+    """Оставляет селекторы, все классы которых встречаются в used."""
+    output = []
+    for prelude, body in split_rules(css):
+        if body is None:
+            output.append(prelude)
+        elif prelude.startswith(NESTED):
+            inner = prune(body, used)
+            if inner:
+                output.append(f'{prelude}{{{inner}}}')
+        elif prelude.startswith('@'):
+            output.append(f'{prelude}{{{body}}}')
+        else:
+            selectors = [selector for selector in split_selectors(prelude)
+                         if selector_used(selector, used)]
+            if selectors:
+                output.append(f'{",".join(selectors)}{{{body}}}')
+    return ''.join(output)
+
+
+class Command(BaseCommand):
+    help = ('Собирает из bootstrap.min.css стили только для классов, '
+            'которые встречаются в шаблонах проекта и в '
+            'PRUNE_CSS_ALLOWLIST. Результат коммитится вместе с шаблонами.')
+
+    def add_arguments(self, parser):
+        static = settings.STATICFILES_DIRS[0]
+        parser.add_argument('--source', default=os.path.join(static, SOURCE))
+        parser.add_argument('--output', default=os.path.join(static, OUTPUT))
+        parser.add_argument(
+            '--allow', action='append', default=[],
+            help='Дополнительный класс; можно повторять.')
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Только проверить, что --output совпадает со сборкой.')
+
+    def template_dirs(self):
+        # Шаблоны сторонних приложений (админки) не используют Bootstrap.
+        directories = [directory for config in settings.TEMPLATES
+                       for directory in config.get('DIRS', [])]
+        return directories + [
+            str(directory) for directory in get_app_template_dirs('templates')
+            if str(directory).startswith(settings.BASE_DIR)]
+
+    def handle(self, *args, **options):
+        used = template_classes(self.template_dirs())
+        used.update(settings.PRUNE_CSS_ALLOWLIST, options['allow'])
+        with open(options['source'], encoding='utf-8') as file:
+            source = file.read()
+        pruned = prune(source, used) + '\n'
+        if options['check']:
+            self.check_output(options['output'], pruned)
+            return
+        with open(options['output'], 'w', encoding='utf-8') as file:
+            file.write(pruned)
+        self.stdout.write(self.style.SUCCESS(
+            f'Классов: {len(used)}; {self.size(source)} -> '
+            f'{self.size(pruned)}'))
+
+    def check_output(self, path, pruned):
+        try:
+            with open(path, encoding='utf-8') as file:
+                current = file.read()
+        except FileNotFoundError:
+            current = None
+        if current != pruned:
+            raise CommandError(
+                f'{path} устарел: запустите manage.py prune_css')
+        self.stdout.write(self.style.SUCCESS(f'{path} актуален'))
+
+    @staticmethod
+    def size(css):
+        data = css.encode()
+        return f'{len(data)} байт ({len(gzip.compress(data))} в gzip)'
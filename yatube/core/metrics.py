@@ -0,0 +1,225 @@
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+
+from django.conf import settings
+
+from posts.caching import card_cache_stats, page_cache_stats
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+CACHES = {'card': card_cache_stats, 'page': page_cache_stats}
+HISTOGRAMS = (
+    ('latency', 'yatube_request_duration_seconds', LATENCY_BUCKETS,
+     'Время ответа представления, секунды.', 'view'),
+    ('queries', 'yatube_request_queries', QUERY_BUCKETS,
+     'Число SQL-запросов на запрос.', 'view'),
+    ('commits', 'yatube_write_commit_seconds', LATENCY_BUCKETS,
+     'Время group commit очереди записи, секунды.', 'writer'),
+)
+GAUGES = {
+    'yatube_write_queue_depth': 'Заданий в очереди записи.',
+}
+
+
+def _observe(histograms, view, buckets, value):
+    # Счётчики по корзинам (последняя — +Inf), затем сумма значений.
+    histogram = histograms.setdefault(view, [0] * (len(buckets) + 2))
+    histogram[bisect_left(buckets, value)] += 1
+    histogram[-1] += value
+
+
+class Registry:
+    """Метрики процесса. Блокировка держится на паре операций со
+    словарями; между процессами данные сводятся через файлы снимков."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = int(time.time())
+        self.flushed = 0
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.requests = Counter()
+            self.latency = {}
+            self.queries = {}
+            self.commits = {}
+            self.writes = Counter()
+            self.gauges = {}
+
+    def observe(self, view, status, seconds, queries):
+        with self.lock:
+            self.requests[view, str(status)] += 1
+            _observe(self.latency, view, LATENCY_BUCKETS, seconds)
+            _observe(self.queries, view, QUERY_BUCKETS, queries)
+
+    def observe_commit(self, writer, seconds, written, failed):
+        with self.lock:
+            _observe(self.commits, writer, LATENCY_BUCKETS, seconds)
+            self.writes[writer, 'ok'] += written
+            self.writes[writer, 'error'] += failed
+
+    def set_gauge(self, name, writer, value):
+        with self.lock:
+            self.gauges[name, writer] = value
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                'requests': [[view, status, count] for (view, status), count
+                             in self.requests.items()],
+                'latency': {view: list(values)
+                            for view, values in self.latency.items()},
+                'queries': {view: list(values)
+                            for view, values in self.queries.items()},
+                'commits': {writer: list(values)
+                            for writer, values in self.commits.items()},
+                'writes': [[writer, result, count] for (writer, result), count
+                           in self.writes.items()],
+                'gauges': [[name, writer, value] for (name, writer), value
+                           in self.gauges.items()],
+                'caches': {name: dict(stats)
+                           for name, stats in CACHES.items()},
+            }
+
+    @property
+    def path(self):
+        return os.path.join(
+            settings.METRICS_DIR, f'{os.getpid()}-{self.started}.json')
+
+    def flush(self, force=False):
+        """Пишет снимок процесса в METRICS_DIR не чаще раза в
+        METRICS_FLUSH_INTERVAL секунд."""
+        now = time.monotonic()
+        if not settings.METRICS_DIR or (
+                not force
+                and now - self.flushed < settings.METRICS_FLUSH_INTERVAL):
+            return
+        self.flushed = now
+        os.makedirs(settings.METRICS_DIR, exist_ok=True)
+        temporary = f'{self.path}.tmp'
+        with open(temporary, 'w') as file:
+            json.dump(self.snapshot(), file)
+        os.replace(temporary, self.path)
+
+
+registry = Registry()
+
+
+def _alive(name):
+    # Снимок называется «<pid>-<время запуска>.json».
+    try:
+        os.kill(int(name.split('-', 1)[0]), 0)
+    except ProcessLookupError:
+        return False
+    except (ValueError, PermissionError):
+        pass
+    return True
+
+
+def _merge(total, snapshot, alive=True):
+    for view, status, count in snapshot['requests']:
+        total['requests'][view, status] += count
+    for name, *_ in HISTOGRAMS:
+        for view, values in snapshot.get(name, {}).items():
+            merged = total[name].setdefault(view, [0] * len(values))
+            total[name][view] = [a + b for a, b in zip(merged, values)]
+    for name, stats in snapshot['caches'].items():
+        total['caches'].setdefault(name, Counter()).update(stats)
+    for writer, result, count in snapshot.get('writes', ()):
+        total['writes'][writer, result] += count
+    # Глубина очередей живых процессов складывается в общую; счётчики
+    # завершившихся процессов остаются, чтобы суммы не уменьшались.
+    if not alive:
+        return
+    for name, writer, value in snapshot.get('gauges', ()):
+        total['gauges'][name, writer] += value
+
+
+def collect():
+    """Сводит снимки всех процессов (или только текущего). Снимки
+    завершившихся процессов дают только счётчики, без gauge."""
+    total = {'requests': Counter(), 'latency': {}, 'queries': {},
+             'commits': {}, 'caches': {}, 'writes': Counter(),
+             'gauges': Counter()}
+    if not settings.METRICS_DIR:
+        _merge(total, registry.snapshot())
+        return total
+    registry.flush(force=True)
+    for name in os.listdir(settings.METRICS_DIR):
+        if not name.endswith('.json'):
+            continue
+        try:
+            with open(os.path.join(settings.METRICS_DIR, name)) as file:
+                _merge(total, json.load(file), _alive(name))
+        except (OSError, ValueError):
+            continue
+    return total
+
+
+def _labels(**labels):
+    pairs = ('{}="{}"'.format(key, str(value).replace('\\', r'\\')
+                              .replace('"', r'\"').replace('\n', r'\n'))
+             for key, value in labels.items())
+    return '{' + ','.join(pairs) + '}'
+
+
+def _histogram(metric, buckets, labels, values):
+    lines = []
+    cumulative = 0
+    for bound, count in zip(buckets + ('+Inf',), values):
+        cumulative += count
+        lines.append(f'{metric}_bucket{_labels(**labels, le=bound)} '
+                     f'{cumulative}')
+    return lines + [f'{metric}_sum{_labels(**labels)} {values[-1]}',
+                    f'{metric}_count{_labels(**labels)} {cumulative}']
+
+
+def render(total):
+    """Метрики в текстовом формате Prometheus."""
+    lines = [
+        '# HELP yatube_requests_total Число запросов по представлениям.',
+        '# TYPE yatube_requests_total counter',
+    ]
+    for (view, status), count in sorted(total['requests'].items()):
+        lines.append(
+            f'yatube_requests_total{_labels(view=view, status=status)} '
+            f'{count}')
+    for name, metric, buckets, help_text, label in HISTOGRAMS:
+        lines += [f'# HELP {metric} {help_text}',
+                  f'# TYPE {metric} histogram']
+        for key, values in sorted(total[name].items()):
+            lines += _histogram(metric, buckets, {label: key}, values)
+    lines += [
+        '# HELP yatube_writes_total Записи через очередь по результату.',
+        '# TYPE yatube_writes_total counter',
+    ]
+    for (writer, result), count in sorted(total['writes'].items()):
+        lines.append(f'yatube_writes_total'
+                     f'{_labels(writer=writer, result=result)} {count}')
+    for metric, help_text in GAUGES.items():
+        lines += [f'# HELP {metric} {help_text}', f'# TYPE {metric} gauge']
+        for (name, writer), value in sorted(total['gauges'].items()):
+            if name == metric:
+                lines.append(f'{metric}{_labels(writer=writer)} {value}')
+    lines += [
+        '# HELP yatube_cache_requests_total Обращения к кешам страниц.',
+        '# TYPE yatube_cache_requests_total counter',
+    ]
+    ratios = []
+    for cache, stats in sorted(total['caches'].items()):
+        for result in ('hits', 'misses'):
+            lines.append(
+                f'yatube_cache_requests_total'
+                f'{_labels(cache=cache, result=result)} {stats[result]}')
+        requests = stats['hits'] + stats['misses']
+        ratio = stats['hits'] / requests if requests else 0
+        ratios.append(f'yatube_cache_hit_ratio{_labels(cache=cache)} '
+                      f'{ratio:.4f}')
+    lines += ['# HELP yatube_cache_hit_ratio Доля попаданий в кеш.',
+              '# TYPE yatube_cache_hit_ratio gauge', *ratios]
+    return '\n'.join(lines) + '\n'
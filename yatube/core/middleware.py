@@ -0,0 +1,346 @@
+import json
+import logging
+import mimetypes
+import os
+import re
+import threading
+from contextlib import ExitStack
+from functools import wraps
+from time import perf_counter
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed, SuspiciousFileOperation
+from django.db import connections
+from django.http import FileResponse, HttpResponseNotModified
+from django.template.base import Template
+from django.utils._os import safe_join
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date
+from django.utils.text import compress_sequence
+from django.views.static import was_modified_since
+
+from .metrics import registry
+from .storage import COMPRESSIBLE, brotli, gzip_compress
+
+logger = logging.getLogger('yatube.profiling')
+_local = threading.local()
+# Сжатые варианты в порядке предпочтения: суффикс файла и кодировка.
+ENCODINGS = (('.br', 'br'), ('.gz', 'gzip'))
+# Файл с хешем в имени не меняется: новая версия получит новое имя.
+IMMUTABLE = 'public, max-age=31536000, immutable'
+REVALIDATE = 'public, max-age=0, must-revalidate'
+# Типы ответов, которые сжимаются на лету.
+COMPRESSIBLE_TYPES = ('text/', 'application/json', 'application/rss+xml',
+                      'application/atom+xml', 'application/javascript')
+# Содержимое этих элементов выводится как есть: пробелы в нём значимы.
+HTML_TOKEN = re.compile(
+    r'(<(pre|textarea|script|style)\b.*?</\2\s*>)|(<[^>]+>)|(\s+)',
+    re.S | re.I)
+TAG_SPACE = re.compile(r'("[^"]*"|\'[^\']*\')|\s+')
+
+
+def accepted_encodings(request):
+    """Кодировки из Accept-Encoding, кроме явно запрещённых q=0."""
+    encodings = set()
+    for item in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        encoding, _, params = item.partition(';')
+        name, _, quality = params.partition('=')
+        try:
+            if name.strip() == 'q' and float(quality) == 0:
+                continue
+        except ValueError:
+            continue
+        encodings.add(encoding.strip().lower())
+    return encodings
+
+
+class RequestProfile:
+    def __init__(self):
+        self.sql_count = 0
+        self.sql_time = 0
+        self.template_time = 0
+        self.rendering = False
+
+    def __call__(self, execute, sql, params, many, context):
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_count += 1
+            self.sql_time += perf_counter() - started
+
+
+def timed_render(render):
+    """Считает время внешнего рендера шаблона; вложенные include
+    уже входят в него."""
+    @wraps(render)
+    def wrapper(self, context):
+        profile = getattr(_local, 'profile', None)
+        if profile is None or profile.rendering:
+            return render(self, context)
+        profile.rendering = True
+        started = perf_counter()
+        try:
+            return render(self, context)
+        finally:
+            profile.template_time += perf_counter() - started
+            profile.rendering = False
+    wrapper.timed = True
+    return wrapper
+
+
+class ProfilingMiddleware:
+    """Время запроса, SQL и шаблонов в Server-Timing и в лог.
+
+    Включается настройкой PROFILING; без неё Django исключает
+    middleware из цепочки при запуске.
+    """
+
+    def __init__(self, get_response):
+        if not settings.PROFILING:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if not getattr(Template.render, 'timed', False):
+            Template.render = timed_render(Template.render)
+
+    def __call__(self, request):
+        profile = _local.profile = RequestProfile()
+        started = perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(profile))
+                response = self.get_response(request)
+        finally:
+            _local.profile = None
+        total = perf_counter() - started
+        response['Server-Timing'] = (
+            f'total;dur={total * 1000:.1f}, '
+            f'sql;dur={profile.sql_time * 1000:.1f};'
+            f'desc="{profile.sql_count} queries", '
+            f'template;dur={profile.template_time * 1000:.1f}'
+        )
+        match = request.resolver_match
+        logger.info(json.dumps({
+            'method': request.method,
+            'path': request.path,
+            'view': match.view_name if match else None,
+            'status': response.status_code,
+            'total_ms': round(total * 1000, 3),
+            'sql_count': profile.sql_count,
+            'sql_ms': round(profile.sql_time * 1000, 3),
+            'template_ms': round(profile.template_time * 1000, 3),
+        }))
+        return response
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class MetricsMiddleware:
+    """Число запросов, время ответа и число SQL-запросов по
+    resolver_match.view_name для /metrics. Включается настройкой METRICS.
+    """
+
+    def __init__(self, get_response):
+        if not settings.METRICS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        counter = QueryCounter()
+        started = perf_counter()
+        with connections['default'].execute_wrapper(counter):
+            response = self.get_response(request)
+        match = request.resolver_match
+        registry.observe(
+            match.view_name if match else 'unresolved',
+            response.status_code,
+            perf_counter() - started,
+            counter.count,
+        )
+        registry.flush()
+        return response
+
+
+def _minify_token(match):
+    preserved, _, tag, space = match.groups()
+    if preserved:
+        return preserved
+    if tag:
+        return TAG_SPACE.sub(lambda part: part.group(1) or ' ', tag)
+    return '\n' if '\n' in space else ' '
+
+
+def minify_html(html):
+    """Сводит пробелы между тегами и внутри тегов к одному символу.
+
+    Браузер всё равно отображает любую такую последовательность как один
+    пробел; pre, textarea, script, style и значения атрибутов не меняются.
+    """
+    return HTML_TOKEN.sub(_minify_token, html)
+
+
+class StaticFilesMiddleware:
+    """Отдаёт собранную collectstatic статику из STATIC_ROOT.
+
+    Выбирает заранее сжатый вариант .br или .gz по Accept-Encoding,
+    файлам с хешем в имени отдаёт Cache-Control immutable на год.
+    Включается настройкой STATIC_SERVE.
+    """
+
+    def __init__(self, get_response):
+        if not settings.STATIC_SERVE:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.hashed = set(
+            getattr(staticfiles_storage, 'hashed_files', {}).values())
+
+    def __call__(self, request):
+        if (request.method in ('GET', 'HEAD')
+                and request.path.startswith(settings.STATIC_URL)):
+            response = self.serve(request,
+                                  request.path[len(settings.STATIC_URL):])
+            if response is not None:
+                return response
+        return self.get_response(request)
+
+    def find(self, request, name):
+        """Путь к файлу и кодировка лучшего доступного варианта."""
+        try:
+            path = safe_join(settings.STATIC_ROOT, name)
+        except SuspiciousFileOperation:
+            return None, None
+        if not os.path.isfile(path):
+            return None, None
+        accepted = accepted_encodings(request)
+        for suffix, encoding in ENCODINGS:
+            if encoding in accepted and os.path.isfile(path + suffix):
+                return path + suffix, encoding
+        return path, None
+
+    def serve(self, request, name):
+        path, encoding = self.find(request, name)
+        if path is None:
+            return None
+        stat = os.stat(path)
+        if not was_modified_since(
+                request.META.get('HTTP_IF_MODIFIED_SINCE'),
+                stat.st_mtime, stat.st_size):
+            response = HttpResponseNotModified()
+        else:
+            content_type, _ = mimetypes.guess_type(name)
+            response = FileResponse(
+                open(path, 'rb'),
+                content_type=content_type or 'application/octet-stream')
+            response['Last-Modified'] = http_date(stat.st_mtime)
+            if encoding:
+                response['Content-Encoding'] = encoding
+        if name.endswith(COMPRESSIBLE):
+            response['Vary'] = 'Accept-Encoding'
+        response['Cache-Control'] = (IMMUTABLE if name in self.hashed
+                                     else REVALIDATE)
+        return response
+
+
+class CompressionMiddleware:
+    """Минифицирует HTML и сжимает ответы в br или gzip по
+    Accept-Encoding.
+
+    Ответы меньше RESPONSE_COMPRESSION_MIN_SIZE байт не сжимаются,
+    степень сжатия задаёт RESPONSE_COMPRESSION_LEVEL. Для страниц из кеша
+    лент (см. posts.caching.cache_anonymous_page) готовый вариант хранится
+    в кеше рядом со страницей и сбрасывается вместе с ней.
+
+    Ответы с CSRF-токеном не сжимаются: по размеру сжатого ответа,
+    отражающего ввод атакующего, токен можно подобрать (BREACH).
+    """
+
+    def __init__(self, get_response):
+        if not (settings.RESPONSE_COMPRESSION
+                or settings.RESPONSE_MINIFY_HTML):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if (response.has_header('Content-Encoding')
+                or 'no-transform' in response.get('Cache-Control', '')
+                or not response.get('Content-Type', '').startswith(
+                    COMPRESSIBLE_TYPES)):
+            return response
+        encoding = None
+        if (settings.RESPONSE_COMPRESSION
+                and not request.META.get('CSRF_COOKIE_USED')):
+            encoding = self.choose(request)
+            patch_vary_headers(response, ('Accept-Encoding',))
+        if response.streaming:
+            if encoding == 'gzip':
+                response.streaming_content = compress_sequence(
+                    response.streaming_content)
+                del response['Content-Length']
+                self.mark(response, encoding)
+            return response
+        if response.status_code != 200 or not response.content:
+            return response
+        content, encoding = self.shared(response, encoding)
+        response.content = content
+        response['Content-Length'] = str(len(content))
+        if encoding:
+            self.mark(response, encoding)
+        return response
+
+    @staticmethod
+    def choose(request):
+        accepted = accepted_encodings(request)
+        if brotli is not None and 'br' in accepted:
+            return 'br'
+        return 'gzip' if 'gzip' in accepted else None
+
+    @staticmethod
+    def mark(response, encoding):
+        # Сжатое тело отличается побайтно, поэтому ETag становится слабым.
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = encoding
+
+    def shared(self, response, encoding):
+        key = getattr(response, 'page_cache_key', None)
+        if key is None:
+            return self.encode(response, encoding)
+        key = f'{key}:{encoding or "identity"}'
+        variant = cache.get(key)
+        if variant is None:
+            variant = self.encode(response, encoding)
+            cache.set(key, variant, settings.POSTS_PAGE_CACHE_TIMEOUT)
+        return variant
+
+    @staticmethod
+    def encode(response, encoding):
+        """Тело и фактическая кодировка: мелкие и несжимаемые ответы
+        остаются как есть."""
+        content = response.content
+        if (settings.RESPONSE_MINIFY_HTML
+                and response['Content-Type'].startswith('text/html')):
+            content = minify_html(
+                content.decode(response.charset)).encode(response.charset)
+        if (not encoding
+                or len(content) < settings.RESPONSE_COMPRESSION_MIN_SIZE):
+            return content, None
+        level = settings.RESPONSE_COMPRESSION_LEVEL[encoding]
+        if encoding == 'br':
+            compressed = brotli.compress(content, quality=level)
+        else:
+            compressed = gzip_compress(content, level)
+        if len(compressed) >= len(content):
+            return content, None
+        return compressed, encoding
@@ -0,0 +1,67 @@
+import gzip
+from io import BytesIO
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Двоичные форматы (png, woff2) уже сжаты, повторное сжатие их не уменьшит.
+COMPRESSIBLE = ('.css', '.js', '.map', '.svg', '.ico', '.txt', '.json',
+                '.xml', '.html')
+# Меньшие файлы сжатие почти не уменьшает, а разбор заголовков дороже.
+MIN_SIZE = 256
+
+
+def gzip_compress(content, level=9):
+    """gzip без времени в заголовке: одно содержимое — одни байты.
+    Параметр mtime у gzip.compress появился только в Python 3.8."""
+    buffer = BytesIO()
+    with gzip.GzipFile(fileobj=buffer, mode='wb', compresslevel=level,
+                       mtime=0) as file:
+        file.write(content)
+    return buffer.getvalue()
+
+
+def compress(content):
+    """Сжатые варианты содержимого: {расширение: байты}. Вариант
+    сохраняется, только если он меньше исходного."""
+    variants = {'.gz': gzip_compress(content)}
+    if brotli is not None:
+        variants['.br'] = brotli.compress(content)
+    return {suffix: data for suffix, data in variants.items()
+            if len(data) < len(content)}
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Имена с хешем содержимого и рядом заранее сжатые .gz и .br
+    (если установлен пакет brotli) для StaticFilesMiddleware."""
+
+    def post_process(self, paths, dry_run=False, **options):
+        # Файлы со ссылками обрабатываются в несколько проходов;
+        # в манифест попадает имя из последнего.
+        hashed = {}
+        for name, hashed_name, processed in super().post_process(
+                paths, dry_run, **options):
+            if hashed_name and not isinstance(processed, Exception):
+                hashed[name] = hashed_name
+            yield name, hashed_name, processed
+        if dry_run:
+            return
+        for name in hashed.values():
+            self.compress_file(name)
+
+    def compress_file(self, name):
+        if not name.endswith(COMPRESSIBLE):
+            return
+        with self.open(name) as file:
+            content = file.read()
+        if len(content) < MIN_SIZE:
+            return
+        for suffix, data in compress(content).items():
+            if self.exists(name + suffix):
+                self.delete(name + suffix)
+            self._save(name + suffix, ContentFile(data))
@@ -0,0 +1,65 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class BenchmarkCommandTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(title='Котики', slug='cats')
+        for index in range(15):
+            Post.objects.create(
+                text=f'Котики {index}', author=cls.user, group=cls.group)
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.report = os.path.join(directory.name, 'report.json')
+
+    def benchmark(self, **options):
+        call_command('benchmark', requests=2, warmup=0, pages='1,2',
+                     stdout=StringIO(), **options)
+
+    def test_report_covers_routes(self):
+        """Отчёт есть для каждого маршрута и глубины страниц."""
+        self.benchmark(output=self.report)
+        with open(self.report) as file:
+            routes = json.load(file)['routes']
+        for label in ('posts:index?page=1', 'posts:group_list?page=2',
+                      'posts:post_detail', 'about:tech', 'users:signup',
+                      'api:post_list'):
+            with self.subTest(label=label):
+                self.assertEqual(routes[label]['status'], 200)
+                self.assertGreater(routes[label]['bytes'], 0)
+        self.assertNotIn('users:logout', routes)
+        self.assertTrue(routes['posts:post_edit']['login'])
+        self.assertEqual(routes['posts:post_edit']['status'], 200)
+        self.assertLessEqual(routes['posts:index?page=1']['queries'], 2)
+
+    def test_baseline_regression(self):
+        """Рост числа запросов относительно базовой линии — ошибка."""
+        self.benchmark(output=self.report)
+        with open(self.report) as file:
+            report = json.load(file)
+        report['routes']['posts:index?page=1']['queries'] -= 1
+        with open(self.report, 'w') as file:
+            json.dump(report, file)
+        with self.assertRaisesMessage(CommandError, 'posts:index?page=1'):
+            self.benchmark(baseline=self.report)
+
+    def test_empty_database(self):
+        """Без данных команда просит сначала заполнить базу."""
+        Post.objects.all().delete()
+        with self.assertRaises(CommandError):
+            self.benchmark()
@@ -0,0 +1,111 @@
+import json
+import os
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core.metrics import collect, registry
+from posts.models import Post
+
+User = get_user_model()
+
+
+@override_settings(METRICS=True)
+class MetricsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        Post.objects.create(text='Тестовый пост', author=cls.user)
+
+    def setUp(self):
+        cache.clear()
+        registry.reset()
+
+    def metrics(self):
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('text/plain', response['Content-Type'])
+        return response.content.decode().splitlines()
+
+    def test_requests_by_view(self):
+        """Запросы, время и SQL считаются по имени представления."""
+        for _ in range(2):
+            self.client.get(reverse('posts:index'))
+        self.client.get(reverse('posts:post_detail', args=(0,)))
+        lines = self.metrics()
+        for line in (
+            'yatube_requests_total{view="posts:index",status="200"} 2',
+            'yatube_requests_total{view="posts:post_detail",status="404"} 1',
+            'yatube_request_duration_seconds_count{view="posts:index"} 2',
+            'yatube_request_queries_bucket{view="posts:index",le="+Inf"} 2',
+        ):
+            with self.subTest(line=line):
+                self.assertIn(line, lines)
+
+    def test_cache_hit_ratio(self):
+        """Доля попаданий считается для кеша карточек."""
+        self.client.get(reverse('posts:index'))
+        lines = self.metrics()
+        self.assertTrue(any(
+            line.startswith('yatube_cache_hit_ratio{cache="card"}')
+            for line in lines))
+
+    def test_multiprocess_snapshots(self):
+        """/metrics суммирует снимки всех процессов из METRICS_DIR."""
+        with tempfile.TemporaryDirectory() as directory:
+            other = {
+                'requests': [['posts:index', '200', 5]],
+                'latency': {'posts:index': [5] + [0] * 11 + [0.01]},
+                'queries': {'posts:index': [0, 0, 5] + [0] * 7 + [10]},
+                'caches': {'card': {'hits': 3, 'misses': 1}},
+            }
+            with open(os.path.join(directory, '1-1.json'), 'w') as file:
+                json.dump(other, file)
+            with override_settings(METRICS_DIR=directory):
+                self.client.get(reverse('posts:index'))
+                lines = self.metrics()
+                self.assertEqual(len(os.listdir(directory)), 2)
+        self.assertIn(
+            'yatube_requests_total{view="posts:index",status="200"} 6',
+            lines)
+        self.assertIn(
+            'yatube_request_duration_seconds_count{view="posts:index"} 6',
+            lines)
+
+    def test_dead_process_gauges(self):
+        """Глубина очереди завершившегося процесса не суммируется,
+        его счётчики остаются."""
+        snapshot = {
+            'requests': [['posts:index', '200', 5]],
+            'caches': {},
+            'gauges': [['yatube_write_queue_depth', 'posts', 7]],
+        }
+        # Номер процесса больше pid_max: такого процесса нет.
+        with tempfile.TemporaryDirectory() as directory:
+            for name in ('1-1.json', f'{2 ** 23}-1.json'):
+                with open(os.path.join(directory, name), 'w') as file:
+                    json.dump(snapshot, file)
+            with override_settings(METRICS_DIR=directory):
+                total = collect()
+        self.assertEqual(total['requests']['posts:index', '200'], 10)
+        self.assertEqual(
+            total['gauges']['yatube_write_queue_depth', 'posts'], 7)
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_token_required(self):
+        """С METRICS_TOKEN /metrics отдаётся только с верным токеном."""
+        url = reverse('metrics')
+        self.assertEqual(self.client.get(url).status_code, 404)
+        self.assertEqual(self.client.get(
+            url, HTTP_AUTHORIZATION='Bearer wrong').status_code, 404)
+        self.assertEqual(self.client.get(
+            url, HTTP_AUTHORIZATION='Bearer secret').status_code, 200)
+
+    @override_settings(METRICS=False)
+    def test_disabled(self):
+        """Без METRICS адрес /metrics не существует."""
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 404)
@@ -0,0 +1,175 @@
+import gzip
+import json
+import re
+import shutil
+import tempfile
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core.middleware import minify_html
+from core.storage import compress, gzip_compress
+from posts.models import Post
+
+User = get_user_model()
+
+
+class ProfilingMiddlewareTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        Post.objects.create(text='Тестовый пост', author=cls.user)
+
+    def test_disabled_by_default(self):
+        """Без PROFILING заголовка Server-Timing нет."""
+        response = Client().get(reverse('posts:index'))
+        self.assertFalse(response.has_header('Server-Timing'))
+
+    @override_settings(PROFILING=True)
+    def test_server_timing_and_log(self):
+        """Включённое профилирование пишет заголовок и строку лога."""
+        with self.assertLogs('yatube.profiling', 'INFO') as logs:
+            response = Client().get(reverse('posts:index'))
+        timing = response['Server-Timing']
+        for metric in ('total;dur=', 'sql;dur=', 'template;dur='):
+            with self.subTest(metric=metric):
+                self.assertIn(metric, timing)
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['view'], 'posts:index')
+        self.assertEqual(record['status'], 200)
+        self.assertGreater(record['sql_count'], 0)
+        self.assertGreater(record['template_ms'], 0)
+
+
+class StaticFilesMiddlewareTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.root = tempfile.mkdtemp()
+        cls.settings = override_settings(
+            STATIC_SERVE=True,
+            STATIC_ROOT=cls.root,
+            STATICFILES_STORAGE=(
+                'core.storage.CompressedManifestStaticFilesStorage'),
+        )
+        cls.settings.enable()
+        call_command('collectstatic', interactive=False, verbosity=0)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.settings.disable()
+        shutil.rmtree(cls.root)
+        super().tearDownClass()
+
+    def test_gzip_is_reproducible(self):
+        """Сжатая копия не содержит времени и распаковывается."""
+        content = b'body{margin:0}' * 100
+        data = compress(content)['.gz']
+        self.assertEqual(data[4:8], bytes(4))
+        self.assertEqual(gzip.decompress(data), content)
+
+    def stylesheet(self):
+        page = Client().get(reverse('posts:index')).content.decode()
+        return re.search(
+            r'href="(/static/css/bootstrap\.pruned\.min\.\w+\.css)"',
+            page).group(1)
+
+    def test_hashed_precompressed(self):
+        """Страница ссылается на файл с хешем, а он отдаётся сжатым
+        и кешируется навсегда."""
+        url = self.stylesheet()
+        response = Client().get(url, HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Content-Type'], 'text/css')
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertIn('immutable', response['Cache-Control'])
+        body = gzip.decompress(b''.join(response.streaming_content))
+        with open(self.root + url[len('/static'):], 'rb') as file:
+            self.assertEqual(body, file.read())
+
+    def test_identity_and_revalidation(self):
+        """Без gzip в Accept-Encoding отдаётся исходный файл; файл без
+        хеша перепроверяется по Last-Modified."""
+        response = Client().get(self.stylesheet(),
+                                HTTP_ACCEPT_ENCODING='gzip;q=0')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        response = Client().get('/static/css/bootstrap.min.css')
+        self.assertIn('must-revalidate', response['Cache-Control'])
+        response = Client().get(
+            '/static/css/bootstrap.min.css',
+            HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_outside_static_root(self):
+        """Пути вне STATIC_ROOT и несуществующие файлы не отдаются."""
+        for url in ('/static/../manage.py', '/static/css/missing.css'):
+            with self.subTest(url=url):
+                self.assertEqual(Client().get(url).status_code, 404)
+
+
+@override_settings(RESPONSE_COMPRESSION=True)
+class CompressionMiddlewareTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        Post.objects.create(text='Тестовый пост', author=cls.user)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_minify_html(self):
+        """Пробелы сводятся к одному, а pre, textarea и значения
+        атрибутов не меняются."""
+        html = ('<div   class="a  b">\n    <p>текст   поста</p>\n  </div>'
+                '<pre>  код\n    с отступом</pre>'
+                '<textarea name="text">  абзац\n\n  второй</textarea>')
+        self.assertEqual(minify_html(html), (
+            '<div class="a  b">\n<p>текст поста</p>\n</div>'
+            '<pre>  код\n    с отступом</pre>'
+            '<textarea name="text">  абзац\n\n  второй</textarea>'))
+
+    def test_gzip_by_accept_encoding(self):
+        """Страница сжимается, только если клиент принимает gzip."""
+        url = reverse('posts:index')
+        plain = Client().get(url)
+        self.assertFalse(plain.has_header('Content-Encoding'))
+        self.assertEqual(plain['Vary'].count('Accept-Encoding'), 1)
+        response = Client().get(url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+        self.assertEqual(response['Content-Length'],
+                         str(len(response.content)))
+
+    @override_settings(RESPONSE_COMPRESSION_MIN_SIZE=10 ** 6)
+    def test_min_size(self):
+        """Ответы меньше порога не сжимаются."""
+        response = Client().get(reverse('posts:index'),
+                                HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_csrf_token_not_compressed(self):
+        """Страница с CSRF-токеном не сжимается, но минифицируется."""
+        response = Client().get(reverse('users:login'),
+                                HTTP_ACCEPT_ENCODING='gzip')
+        self.assertContains(response, 'csrfmiddlewaretoken')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertNotIn(b'\n  ', response.content)
+
+    @override_settings(POSTS_PAGE_CACHE=True)
+    def test_shared_with_page_cache(self):
+        """Сжатая страница из кеша лент не сжимается повторно."""
+        with mock.patch('core.middleware.gzip_compress',
+                        wraps=gzip_compress) as compress:
+            responses = [Client().get(reverse('posts:index'),
+                                      HTTP_ACCEPT_ENCODING='gzip')
+                         for _ in range(2)]
+        self.assertEqual(compress.call_count, 1)
+        self.assertEqual(responses[0].content, responses[1].content)
@@ -0,0 +1,45 @@
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+from core.management.commands.prune_css import prune, template_classes
+
+CSS = ('@charset "UTF-8";/*! лицензия */:root{--bs-blue:#0d6efd}'
+       'body{margin:0}.btn{padding:0}.btn-primary,.modal{color:red}'
+       '.btn:not(.active){opacity:1}.was-validated .btn{color:green}'
+       '.icon{background:url("data:image/svg+xml,\'{}\'")}'
+       '@media (min-width:768px){.col-md-6{width:50%}.col-lg-6{width:50%}}'
+       '@keyframes spin{to{transform:rotate(360deg)}}'
+       '/*# sourceMappingURL=bootstrap.min.css.map */')
+
+
+class PruneCssTests(SimpleTestCase):
+    def test_prune_keeps_used_selectors(self):
+        """Остаются правила для используемых классов и без классов."""
+        pruned = prune(CSS, {'btn', 'btn-primary', 'col-md-6', 'icon'})
+        self.assertEqual(pruned, (
+            '@charset "UTF-8";/*! лицензия */:root{--bs-blue:#0d6efd}'
+            'body{margin:0}.btn{padding:0}.btn-primary{color:red}'
+            '.btn:not(.active){opacity:1}'
+            '.icon{background:url("data:image/svg+xml,\'{}\'")}'
+            '@media (min-width:768px){.col-md-6{width:50%}}'
+            '@keyframes spin{to{transform:rotate(360deg)}}'))
+
+    def test_template_classes(self):
+        """Классы берутся из атрибутов class, в том числе внутри тегов
+        шаблона, и из фильтра addclass."""
+        with tempfile.TemporaryDirectory() as directory:
+            with open(os.path.join(directory, 'page.html'), 'w') as file:
+                file.write(
+                    '<a class="nav-link {% if x == \'a:b\' %}active'
+                    '{% endif %}">{{ field|addclass:\'form-control\' }}</a>')
+            self.assertEqual(template_classes([directory]),
+                             {'nav-link', 'active', 'form-control'})
+
+    def test_committed_stylesheet_is_fresh(self):
+        """Закоммиченный bootstrap.pruned.min.css собран по текущим
+        шаблонам."""
+        call_command('prune_css', check=True, stdout=StringIO())
@@ -0,0 +1,77 @@
+import importlib
+import os
+import sys
+from unittest import mock
+
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from core.checks import debug_overhead, per_process_cache
+from core.signals import apply_sqlite_pragmas
+
+
+class ProductionSettingsTests(SimpleTestCase):
+    def load(self, **environ):
+        sys.modules.pop('yatube.settings_production', None)
+        with mock.patch.dict(os.environ, {
+                'YATUBE_SECRET_KEY': 'secret', **environ}):
+            return importlib.import_module('yatube.settings_production')
+
+    def test_production_profile(self):
+        """Боевой профиль читает окружение и включает оптимизации."""
+        settings = self.load(YATUBE_ALLOWED_HOSTS='yatube.ru, www.yatube.ru',
+                             YATUBE_CONN_MAX_AGE='60')
+        self.assertFalse(settings.DEBUG)
+        self.assertEqual(settings.ALLOWED_HOSTS,
+                         ['yatube.ru', 'www.yatube.ru'])
+        self.assertEqual(settings.DATABASES['default']['CONN_MAX_AGE'], 60)
+        self.assertEqual(settings.SQLITE_PRAGMAS['journal_mode'], 'WAL')
+        self.assertEqual(
+            settings.TEMPLATES[0]['OPTIONS']['loaders'][0][0],
+            'django.template.loaders.cached.Loader')
+        self.assertTrue(settings.PERFORMANCE_CHECKS)
+
+    def test_development_settings_untouched(self):
+        """Боевой профиль не меняет базовые настройки."""
+        from yatube import settings
+        self.load()
+        self.assertEqual(
+            settings.DATABASES['default'].get('CONN_MAX_AGE', 0), 0)
+        self.assertTrue(settings.TEMPLATES[0]['APP_DIRS'])
+
+
+class StartupChecksTests(SimpleTestCase):
+    @override_settings(PERFORMANCE_CHECKS=True, DEBUG=True, PROFILING=True)
+    def test_debug_overhead_warnings(self):
+        """Проверка предупреждает об отладочных накладных расходах."""
+        ids = {warning.id for warning in debug_overhead(None)}
+        self.assertEqual(ids, {'core.W001', 'core.W002', 'core.W003'})
+
+    @override_settings(PERFORMANCE_CHECKS=False, DEBUG=True)
+    def test_checks_disabled(self):
+        """В режиме разработки проверка молчит."""
+        self.assertEqual(debug_overhead(None), [])
+        self.assertEqual(per_process_cache(None), [])
+
+    @override_settings(PERFORMANCE_CHECKS=True)
+    def test_per_process_cache_warning(self):
+        """Кеш в памяти процесса вызывает предупреждение, общий — нет."""
+        self.assertEqual(
+            [warning.id for warning in per_process_cache(None)],
+            ['core.W004'])
+        shared = {'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': '/tmp/yatube-cache',
+        }}
+        with override_settings(CACHES=shared):
+            self.assertEqual(per_process_cache(None), [])
+
+
+class SqlitePragmasTests(TestCase):
+    @override_settings(SQLITE_PRAGMAS={'cache_size': -4096})
+    def test_pragmas_applied_on_connect(self):
+        """PRAGMA из настроек выполняются на новом соединении."""
+        apply_sqlite_pragmas(sender=None, connection=connection)
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA cache_size')
+            self.assertEqual(cursor.fetchone()[0], -4096)
@@ -0,0 +1,23 @@
+import hmac
+
+from django.conf import settings
+from django.http import Http404, HttpResponse
+
+from .metrics import collect, render
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def authorized(request):
+    if not settings.METRICS_TOKEN:
+        return True
+    expected = f'Bearer {settings.METRICS_TOKEN}'
+    return hmac.compare_digest(
+        request.META.get('HTTP_AUTHORIZATION', '').encode(),
+        expected.encode())
+
+
+def metrics(request):
+    if not settings.METRICS or not authorized(request):
+        raise Http404
+    return HttpResponse(render(collect()), content_type=CONTENT_TYPE)
@@ -1,6 +1,52 @@
-from django.contrib import admin
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin import helpers
+from django.contrib.admin.models import CHANGE, DELETION, LogEntry
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.template.response import TemplateResponse
 
 from .models import Post, Group
+from .moderation import delete_posts, move_posts
+from .paginators import CachedCountPaginator
+from .search import filter_by_search
+
+# Сколько id постов попадает в журнал админки; остальные описывает фильтр.
+LOG_IDS = 20
+
+
+class LoadedAutocompleteSelect(AutocompleteSelect):
+    """Автокомплит, который берёт выбранный объект из уже загруженной
+    строки списка, а не отдельным запросом на каждую строку."""
+
+    selected_objects = None
+
+    def optgroups(self, name, value, attr=None):
+        loaded = {str(obj.pk) for obj in self.selected_objects or ()}
+        if self.selected_objects is None or not loaded.issuperset(
+                v for v in value if v not in self.choices.field.empty_values):
+            return super().optgroups(name, value, attr)
+        default = (None, [], 0)
+        if not self.is_required:
+            default[1].append(self.create_option(name, "", "", False, 0))
+        label = self.choices.field.label_from_instance
+        for obj in self.selected_objects:
+            if str(obj.pk) in value:
+                default[1].append(self.create_option(
+                    name, obj.pk, label(obj), True, len(default[1])))
+        return [default]
+
+
+class AssignGroupForm(forms.Form):
+    def __init__(self, *args, admin_site, **kwargs):
+        super().__init__(*args, **kwargs)
+        group = Post._meta.get_field("group")
+        self.fields["group"] = forms.ModelChoiceField(
+            queryset=Group.objects.all(),
+            label=group.verbose_name,
+            widget=AutocompleteSelect(group.remote_field, admin_site),
+        )
 
 
 class PostAdmin(admin.ModelAdmin):
@@ -12,9 +58,143 @@ class PostAdmin(admin.ModelAdmin):
         "group",
     )
     list_editable = ("group",)
+    list_select_related = ("author", "group")
+    autocomplete_fields = ("group",)
     search_fields = ("text",)
     list_filter = ("pub_date",)
+    date_hierarchy = "pub_date"
     empty_value_display = "-пусто-"
+    # Без точного COUNT(*) по всей таблице на каждой странице списка:
+    # число найденных берётся из кеша, а выше порога — оценкой.
+    paginator = CachedCountPaginator
+    show_full_result_count = False
+    # Массовые действия выполняются одним UPDATE/DELETE по выборке
+    # (или по всему отфильтрованному списку) без загрузки постов.
+    actions = ("assign_group", "clear_group", "delete_posts")
+
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        actions.pop("delete_selected", None)
+        return actions
+
+    def bulk_action_page(self, request, queryset, action, title,
+                         submit_label, form=None):
+        context = {
+            **self.admin_site.each_context(request),
+            "title": title,
+            "opts": self.model._meta,
+            "count": queryset.count(),
+            "form": form,
+            "media": self.media + (form.media if form else forms.Media()),
+            "action": action,
+            "action_checkbox_name": helpers.ACTION_CHECKBOX_NAME,
+            "selected": request.POST.getlist(helpers.ACTION_CHECKBOX_NAME),
+            "select_across": request.POST.get("select_across", "0"),
+            "submit_label": submit_label,
+        }
+        return TemplateResponse(
+            request, "admin/posts/post/bulk_action.html", context)
+
+    @staticmethod
+    def id_sample(queryset):
+        """Первые LOG_IDS id выборки; читать в транзакции действия,
+        чтобы журнал совпадал с изменёнными строками."""
+        ids = list(queryset.order_by("pk")
+                   .values_list("pk", flat=True)[:LOG_IDS + 1])
+        sample = ", ".join(map(str, ids[:LOG_IDS]))
+        return sample + ", …" if len(ids) > LOG_IDS else sample
+
+    def log_bulk(self, request, action_flag, action, sample, count):
+        """Одна запись журнала админки на всё действие вместо записи
+        на каждый пост, как у delete_selected: число постов, образец
+        id и фильтр списка, по которому шло действие."""
+        if not count:
+            return
+        change_message = f"id: {sample}"
+        if request.GET:
+            change_message += f"; фильтр: {request.GET.urlencode()}"
+        LogEntry.objects.log_action(
+            user_id=request.user.pk,
+            content_type_id=ContentType.objects.get_for_model(Post).pk,
+            object_id=None,
+            object_repr=f"{action} постов: {count}"[:200],
+            action_flag=action_flag,
+            change_message=change_message,
+        )
+
+    def assign_group(self, request, queryset):
+        form = AssignGroupForm(
+            request.POST if "apply" in request.POST else None,
+            admin_site=self.admin_site,
+        )
+        if not form.is_valid():
+            return self.bulk_action_page(
+                request, queryset, "assign_group", "Перенос в группу",
+                "Перенести", form)
+        group = form.cleaned_data["group"]
+        with transaction.atomic():
+            sample = self.id_sample(queryset.exclude(group=group))
+            moved = move_posts(queryset, group)
+            self.log_bulk(
+                request, CHANGE, f"Перенесено в «{group}»", sample, moved)
+        self.message_user(
+            request, f"Перенесено постов: {moved}", messages.SUCCESS)
+
+    assign_group.short_description = "Перенести в группу"
+    assign_group.allowed_permissions = ("change",)
+
+    def clear_group(self, request, queryset):
+        with transaction.atomic():
+            sample = self.id_sample(queryset.exclude(group=None))
+            moved = move_posts(queryset, None)
+            self.log_bulk(request, CHANGE, "Убрано из групп", sample, moved)
+        self.message_user(
+            request, f"Убрано из групп постов: {moved}", messages.SUCCESS)
+
+    clear_group.short_description = "Убрать из группы"
+    clear_group.allowed_permissions = ("change",)
+
+    def delete_posts(self, request, queryset):
+        if "apply" not in request.POST:
+            return self.bulk_action_page(
+                request, queryset, "delete_posts", "Удаление постов",
+                "Удалить")
+        with transaction.atomic():
+            sample = self.id_sample(queryset)
+            deleted = delete_posts(queryset)
+            self.log_bulk(request, DELETION, "Удалено", sample, deleted)
+        self.message_user(
+            request, f"Удалено постов: {deleted}", messages.SUCCESS)
+
+    delete_posts.short_description = "Удалить посты"
+    delete_posts.allowed_permissions = ("delete",)
+
+    def get_changelist_form(self, request, **kwargs):
+        form_class = super().get_changelist_form(request, **kwargs)
+
+        class ChangeListForm(form_class):
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+                widget = self.fields["group"].widget
+                widget = getattr(widget, "widget", widget)
+                if isinstance(widget, LoadedAutocompleteSelect):
+                    widget.selected_objects = (
+                        [self.instance.group] if self.instance.group_id
+                        else [])
+
+        return ChangeListForm
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if db_field.name in self.get_autocomplete_fields(request):
+            kwargs.setdefault("widget", LoadedAutocompleteSelect(
+                db_field.remote_field, self.admin_site,
+                using=kwargs.get("using")))
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term.strip():
+            return queryset, False
+        return filter_by_search(queryset, search_term), False
 
 
 class GroupAdmin(admin.ModelAdmin):
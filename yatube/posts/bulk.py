@@ -0,0 +1,38 @@
+from collections import Counter
+from contextlib import contextmanager
+
+from .counters import update_post_counters
+from .models import Post
+
+DATE_FIELDS = {'pub_date': 'auto_now_add', 'updated_at': 'auto_now'}
+
+
+@contextmanager
+def explicit_dates():
+    """Даёт bulk_create сохранить заданные pub_date и updated_at.
+
+    Иначе auto_now_add и auto_now перезаписывают даты перенесённых постов
+    текущим временем. Даты в объектах должны быть заполнены.
+    """
+    fields = [Post._meta.get_field(name) for name in DATE_FIELDS]
+    try:
+        for field in fields:
+            setattr(field, DATE_FIELDS[field.name], False)
+        yield
+    finally:
+        for field in fields:
+            setattr(field, DATE_FIELDS[field.name], True)
+
+
+def insert_posts(posts, batch_size=None):
+    """Вставляет посты через bulk_create и сдвигает счётчики.
+
+    Сигналы не срабатывают: кеш лент вызывающий сбрасывает сам, одним
+    bump_versions после всей вставки. Поисковый индекс ведут триггеры.
+    """
+    created = Post.objects.bulk_create(posts, batch_size=batch_size)
+    update_post_counters(
+        Counter(post.author_id for post in created),
+        Counter(post.group_id for post in created),
+    )
+    return len(created)
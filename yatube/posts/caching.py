@@ -0,0 +1,194 @@
+import hashlib
+import time
+from collections import Counter
+from functools import lru_cache, partial, wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Max, OuterRef, Subquery
+from django.http import HttpResponse
+from django.template.loader import get_template
+
+from .models import AuthorStats, Group, Post
+
+VERSION_KEY = 'posts:version:{}'
+CARD_KEY = 'posts:card:{}:{}:{}:{}'
+CARD_TEMPLATE = 'includes/card.html'
+PAGE_KEY = 'posts:page:{}'
+# Области версий страниц: все страницы лент, главная, группа, автор.
+PAGES_SCOPE = 'pages'
+INDEX_SCOPE = 'index'
+GROUP_SCOPE = 'group:{slug}'
+AUTHOR_SCOPE = 'author:{username}'
+
+card_cache_stats = Counter(hits=0, misses=0)
+page_cache_stats = Counter(hits=0, misses=0)
+
+
+def version_key(scope):
+    # Слаги и имена пользователей бывают не ASCII и длинными, а memcached
+    # принимает только короткие ключи из ASCII без пробелов.
+    return VERSION_KEY.format(hashlib.md5(scope.encode()).hexdigest())
+
+
+def _new_version():
+    # Версия от времени, а не с единицы: после вытеснения ключа из кеша
+    # старые записи не должны снова стать актуальными.
+    return int(time.time() * 1000)
+
+
+def get_versions(*scopes):
+    keys = [version_key(scope) for scope in scopes]
+    versions = cache.get_many(keys)
+    missing = {key: _new_version() for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, None)
+        versions.update(missing)
+    return tuple(versions[key] for key in keys)
+
+
+def get_version(scope):
+    return get_versions(scope)[0]
+
+
+def _bump(scopes):
+    for scope in scopes:
+        key = version_key(scope)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, _new_version(), None)
+
+
+def bump_versions(*scopes):
+    """Сдвигает версии после фиксации текущей транзакции, вне
+    транзакции — сразу. Сдвиг до COMMIT позволил бы параллельному
+    запросу закешировать старые строки под новой версией."""
+    transaction.on_commit(partial(_bump, scopes))
+
+
+@lru_cache(maxsize=None)
+def card_template_version():
+    """Хеш исходника шаблона карточки: после деплоя с новой разметкой
+    старые карточки в постоянном кеше больше не находятся."""
+    source = get_template(CARD_TEMPLATE).template.source
+    return hashlib.md5(source.encode()).hexdigest()[:8]
+
+
+def card_key(post, *flags):
+    return CARD_KEY.format(
+        card_template_version(),
+        post.pk,
+        post.updated_at.timestamp(),
+        ''.join('1' if flag else '0' for flag in flags),
+    )
+
+
+def cache_anonymous_page(scope, setting='POSTS_PAGE_CACHE'):
+    """Кеширует GET-ответ ленты для анонимов до смены версии scope.
+
+    scope — шаблон области версий, форматируется kwargs представления.
+    Включается настройкой setting (по умолчанию POSTS_PAGE_CACHE).
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if (not getattr(settings, setting)
+                    or request.method != 'GET'
+                    or request.user.is_authenticated):
+                return view(request, *args, **kwargs)
+            versions = get_versions(PAGES_SCOPE, scope.format(**kwargs))
+            # Состояние из базы: при кеше на процесс версии другого
+            # процесса сюда не доходят.
+            signature = '{}|{}|{}|{}|{}'.format(
+                request.path,
+                request.GET.get('page', ''),
+                request.GET.get('cursor', ''),
+                versions,
+                request_feed_state(request, scope, kwargs),
+            )
+            key = PAGE_KEY.format(
+                hashlib.md5(signature.encode()).hexdigest())
+            cached = cache.get(key)
+            if cached is not None:
+                page_cache_stats['hits'] += 1
+                content, content_type = cached
+                response = HttpResponse(content, content_type=content_type)
+                # По ключу CompressionMiddleware кеширует сжатые варианты.
+                response.page_cache_key = key
+                return response
+            page_cache_stats['misses'] += 1
+            response = view(request, *args, **kwargs)
+            if response.status_code == 200 and not response.streaming:
+                cache.set(key, (response.content, response['Content-Type']),
+                          settings.POSTS_PAGE_CACHE_TIMEOUT)
+                response.page_cache_key = key
+            return response
+        return wrapper
+    return decorator
+
+
+def _etag(*parts):
+    return hashlib.md5(repr(parts).encode()).hexdigest()
+
+
+def feed_state(scope, **kwargs):
+    """Дата последнего поста и число постов ленты одним запросом по
+    индексам (-pub_date, -id), (group, ...) и (author, ...).
+
+    Не зависит от кеша, поэтому новый пост меняет ETag во всех процессах,
+    даже если у каждого свой кеш версий.
+    """
+    def latest(**lookup):
+        return Subquery(Post.objects.filter(**lookup).order_by(
+            '-pub_date').values('pub_date')[:1])
+
+    if scope == GROUP_SCOPE:
+        return Group.objects.filter(slug=kwargs['slug']).values_list(
+            'post_count', latest(group=OuterRef('pk'))).first()
+    if scope == AUTHOR_SCOPE:
+        return AuthorStats.objects.filter(
+            author__username=kwargs['username']).values_list(
+            'post_count', latest(author=OuterRef('author_id'))).first()
+    return tuple(Post.objects.aggregate(Max('pub_date'), Max('id')).values())
+
+
+def request_feed_state(request, scope, kwargs):
+    # ETag и кеш страниц одного запроса обходятся одним запросом к базе.
+    if not hasattr(request, '_feed_state'):
+        request._feed_state = feed_state(scope, **kwargs)
+    return request._feed_state
+
+
+def feed_etag(scope):
+    """ETag ленты: состояние из feed_state и версии кеша, которые
+    сдвигаются и при правке постов."""
+    def etag(request, *args, **kwargs):
+        return _etag(
+            request_feed_state(request, scope, kwargs),
+            get_versions(PAGES_SCOPE, scope.format(**kwargs)),
+            request.user.pk,
+            request.GET.get('page', ''),
+            request.GET.get('cursor', ''),
+        )
+    return etag
+
+
+def _post_state(request, post_id):
+    if not hasattr(request, '_post_state'):
+        request._post_state = Post.objects.filter(pk=post_id).values_list(
+            'updated_at', 'author__stats__post_count').first()
+    return request._post_state
+
+
+def post_etag(request, post_id):
+    state = _post_state(request, post_id)
+    if state is None:
+        return None
+    return _etag(state, request.user.pk)
+
+
+def post_last_modified(request, post_id):
+    state = _post_state(request, post_id)
+    return state[0] if state else None
@@ -0,0 +1,40 @@
+from django.core.checks import Tags, Warning, register
+from django.db import connection
+
+FTS_TABLE = 'posts_post_fts'
+# Триггеры из миграции 0010_post_search_index, которые ведут индекс поиска.
+FTS_TRIGGERS = {
+    'posts_post_fts_insert',
+    'posts_post_fts_delete',
+    'posts_post_fts_update',
+}
+
+
+@register(Tags.database)
+def fts_triggers(app_configs, **kwargs):
+    """Пересоздание posts_post в SQLite молча удаляет триггеры поиска,
+    и индекс перестаёт обновляться. Запуск: manage.py check --tag
+    database.
+
+    migrate тоже выполняет эту проверку до применения миграций, поэтому
+    она только предупреждает и молчит, пока таблицы индекса нет (база
+    новая или 0010 ещё не применена): иначе migrate бы не запустился.
+    """
+    if connection.vendor != 'sqlite':
+        return []
+    with connection.cursor() as cursor:
+        if FTS_TABLE not in connection.introspection.table_names(cursor):
+            return []
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' "
+            "AND tbl_name = 'posts_post'")
+        missing = FTS_TRIGGERS - {name for name, in cursor.fetchall()}
+    if not missing:
+        return []
+    return [Warning(
+        'Нет триггеров поискового индекса: {}.'.format(
+            ', '.join(sorted(missing))),
+        hint='Создайте их заново миграцией с CREATE_SQL из '
+             'posts/migrations/0010_post_search_index.py.',
+        id='posts.W001',
+    )]
@@ -2,3 +2,4 @@ TEXT_LEN = 15
 COUNT = 15
 NUM_POST = 10
 NUM_PAG = 3
+NUM_FEED = 20
@@ -0,0 +1,74 @@
+from collections import defaultdict
+
+from django.db.models import Count, F
+from django.db.models.functions import Greatest
+
+from .models import AuthorStats, Group, Post
+
+
+def _ids_by_delta(deltas):
+    grouped = defaultdict(list)
+    for pk, delta in deltas.items():
+        if pk is not None and delta:
+            grouped[delta].append(pk)
+    return grouped
+
+
+def _shift(model, field, ids_by_delta):
+    updated = 0
+    for delta, ids in ids_by_delta.items():
+        updated += model.objects.filter(**{f'{field}__in': ids}).update(
+            post_count=Greatest(F('post_count') + delta, 0))
+    return updated
+
+
+def update_post_counters(author_deltas=None, group_deltas=None):
+    """Сдвигает счётчики постов: {pk автора или группы: delta}.
+
+    Один UPDATE с F-выражением на каждое значение delta. Недостающие
+    строки статистики создаются пересчётом и только для авторов,
+    получивших посты: при каскадном удалении автора их создавать нельзя.
+    """
+    _shift(Group, 'pk', _ids_by_delta(group_deltas or {}))
+    author_deltas = _ids_by_delta(author_deltas or {})
+    updated = _shift(AuthorStats, 'author_id', author_deltas)
+    if updated == sum(len(ids) for ids in author_deltas.values()):
+        return
+    gained = [pk for delta, ids in author_deltas.items() if delta > 0
+              for pk in ids]
+    existing = set(AuthorStats.objects.filter(
+        author_id__in=gained).values_list('author_id', flat=True))
+    missing = [pk for pk in gained if pk not in existing]
+    if missing:
+        recount_authors(missing)
+
+
+def _post_counts(field, ids):
+    return dict(
+        Post.objects.filter(**{f'{field}__in': ids})
+        .order_by()
+        .values_list(field)
+        .annotate(Count('id'))
+    )
+
+
+def recount_authors(author_ids):
+    counts = _post_counts('author', author_ids)
+    stats = AuthorStats.objects.filter(author_id__in=author_ids)
+    found = {item.author_id: item for item in stats}
+    for author_id, item in found.items():
+        item.post_count = counts.get(author_id, 0)
+    AuthorStats.objects.bulk_update(found.values(), ('post_count',))
+    AuthorStats.objects.bulk_create(
+        [AuthorStats(author_id=pk, post_count=counts.get(pk, 0))
+         for pk in author_ids if pk not in found],
+        ignore_conflicts=True,
+    )
+
+
+def recount_groups(group_ids):
+    counts = _post_counts('group', group_ids)
+    groups = list(Group.objects.filter(pk__in=group_ids).only('pk'))
+    for group in groups:
+        group.post_count = counts.get(group.pk, 0)
+    Group.objects.bulk_update(groups, ('post_count',))
@@ -0,0 +1,114 @@
+from django.contrib.auth import get_user_model
+from django.contrib.syndication.views import Feed
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.feedgenerator import Atom1Feed
+from django.views.decorators.http import condition
+
+from .caching import (AUTHOR_SCOPE, GROUP_SCOPE, INDEX_SCOPE,
+                      cache_anonymous_page, feed_etag)
+from .const import NUM_FEED
+from .models import Group, Post
+
+User = get_user_model()
+
+
+class PostFeed(Feed):
+    """RSS-лента последних NUM_FEED постов."""
+
+    title = 'Yatube'
+    description = 'Последние записи Yatube'
+
+    def link(self):
+        return reverse('posts:index')
+
+    def items(self):
+        return Post.objects.for_feed()[:NUM_FEED]
+
+    def item_title(self, item):
+        return str(item)
+
+    def item_description(self, item):
+        return item.text
+
+    def item_link(self, item):
+        return reverse('posts:post_detail', args=(item.pk,))
+
+    def item_author_name(self, item):
+        return item.author.get_full_name() or item.author.username
+
+    def item_pubdate(self, item):
+        return item.pub_date
+
+    def item_updateddate(self, item):
+        return item.updated_at
+
+    def item_categories(self, item):
+        return (item.group.title,) if item.group else ()
+
+
+class GroupPostFeed(PostFeed):
+    def get_object(self, request, slug):
+        return get_object_or_404(Group, slug=slug)
+
+    def title(self, group):
+        return f'Yatube: {group.title}'
+
+    def description(self, group):
+        return group.description
+
+    def link(self, group):
+        return reverse('posts:group_list', args=(group.slug,))
+
+    def items(self, group):
+        return group.posts.for_feed()[:NUM_FEED]
+
+
+class AuthorPostFeed(PostFeed):
+    def get_object(self, request, username):
+        return get_object_or_404(User, username=username)
+
+    def title(self, author):
+        return f'Yatube: {author.get_full_name() or author.username}'
+
+    def description(self, author):
+        return f'Записи пользователя {author.username}'
+
+    def link(self, author):
+        return reverse('posts:profile', args=(author.username,))
+
+    def items(self, author):
+        return author.posts.for_feed()[:NUM_FEED]
+
+
+class AtomFeedMixin:
+    feed_type = Atom1Feed
+
+    def subtitle(self, obj):
+        return self._get_dynamic_attr('description', obj)
+
+
+class PostAtomFeed(AtomFeedMixin, PostFeed):
+    pass
+
+
+class GroupPostAtomFeed(AtomFeedMixin, GroupPostFeed):
+    pass
+
+
+class AuthorPostAtomFeed(AtomFeedMixin, AuthorPostFeed):
+    pass
+
+
+def feed_view(feed, scope):
+    """Лента с ETag и кешем до следующего сохранения поста в scope."""
+    view = cache_anonymous_page(scope, setting='POSTS_FEED_CACHE')(feed)
+    return condition(etag_func=feed_etag(scope))(view)
+
+
+index_feed = feed_view(PostFeed(), INDEX_SCOPE)
+index_atom_feed = feed_view(PostAtomFeed(), INDEX_SCOPE)
+group_feed = feed_view(GroupPostFeed(), GROUP_SCOPE)
+group_atom_feed = feed_view(GroupPostAtomFeed(), GROUP_SCOPE)
+profile_feed = feed_view(AuthorPostFeed(), AUTHOR_SCOPE)
+profile_atom_feed = feed_view(AuthorPostAtomFeed(), AUTHOR_SCOPE)
@@ -0,0 +1,133 @@
+import csv
+import gzip
+import io
+import json
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from posts.models import Post
+
+FORMATS = ('jsonl', 'csv')
+# Те же поля, что читает import_posts, плюс id и дата изменения.
+FIELDS = ('id', 'text', 'author', 'group', 'pub_date', 'updated_at')
+COLUMNS = ('id', 'text', 'author__username', 'group__slug', 'pub_date',
+           'updated_at')
+
+
+def parse_moment(value):
+    """Дата или дата-время из ISO 8601; дата — начало дня."""
+    moment = parse_datetime(value)
+    if moment is None:
+        date = parse_date(value)
+        if date is None:
+            raise ValueError(value)
+        moment = datetime.combine(date, datetime.min.time())
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+class Command(BaseCommand):
+    help = ('Выгружает посты в JSONL или CSV потоком, частями из базы. '
+            'Формат совместим с import_posts.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', nargs='?', default='-',
+            help='Файл для выгрузки; «-» — stdout.')
+        parser.add_argument('--format', choices=FORMATS)
+        parser.add_argument(
+            '--gzip', action='store_true',
+            help='Сжать выгрузку (включается и по расширению .gz).')
+        parser.add_argument('--group', help='slug группы')
+        parser.add_argument('--author', help='username автора')
+        parser.add_argument(
+            '--since', help='pub_date не раньше (ISO 8601, включительно)')
+        parser.add_argument(
+            '--until', help='pub_date раньше (ISO 8601, не включительно)')
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        path = options['path']
+        name = path[:-3] if path.lower().endswith('.gz') else path
+        compress = options['gzip'] or name != path
+        fmt = options['format'] or (
+            'csv' if name.lower().endswith('.csv') else 'jsonl')
+        rows = self.get_rows(options)
+        # Отчёт не должен попасть в сами данные, когда они идут в stdout.
+        report = self.stderr if path == '-' else self.stdout
+        started = time.monotonic()
+        exported = 0
+        with self.open(path, compress) as stream:
+            write = self.writer(fmt, stream)
+            for exported, row in enumerate(rows, 1):
+                write(self.format_row(row))
+                if options['verbosity'] > 1 and (
+                        exported % options['chunk_size'] == 0):
+                    self.progress(report, exported, started)
+        self.progress(report, exported, started, final=True)
+
+    def get_rows(self, options):
+        posts = Post.objects.all()
+        if options['group']:
+            posts = posts.filter(group__slug=options['group'])
+        if options['author']:
+            posts = posts.filter(author__username=options['author'])
+        for option, lookup in (('since', 'gte'), ('until', 'lt')):
+            if options[option]:
+                try:
+                    moment = parse_moment(options[option])
+                except ValueError:
+                    raise CommandError(f'Некорректная дата --{option}')
+                posts = posts.filter(**{f'pub_date__{lookup}': moment})
+        # По индексу ленты (pub_date, id), без сортировки всей выборки.
+        return (posts.order_by('pub_date', 'id').values_list(*COLUMNS)
+                .iterator(chunk_size=options['chunk_size']))
+
+    @contextmanager
+    def open(self, path, compress):
+        if path != '-':
+            opener = gzip.open if compress else open
+            with opener(path, 'wt', encoding='utf-8', newline='') as stream:
+                yield stream
+            return
+        raw = sys.stdout.buffer
+        if compress:
+            raw = gzip.GzipFile(fileobj=raw, mode='wb')
+        stream = io.TextIOWrapper(raw, encoding='utf-8', newline='')
+        try:
+            yield stream
+        finally:
+            # Дописываем и отсоединяемся, не закрывая сам stdout.
+            stream.flush()
+            stream.detach()
+            if compress:
+                raw.close()
+
+    def writer(self, fmt, stream):
+        if fmt == 'csv':
+            writer = csv.writer(stream)
+            writer.writerow(FIELDS)
+            return writer.writerow
+
+        def write(row):
+            stream.write(json.dumps(dict(zip(FIELDS, row)),
+                                    ensure_ascii=False) + '\n')
+        return write
+
+    @staticmethod
+    def format_row(row):
+        return [value.isoformat() if hasattr(value, 'isoformat') else value
+                for value in row]
+
+    def progress(self, report, exported, started, final=False):
+        elapsed = time.monotonic() - started
+        rate = exported / elapsed if elapsed else 0
+        message = f'Выгружено постов: {exported}, {rate:.0f} строк/с'
+        report.write(self.style.SUCCESS(message) if final else message)
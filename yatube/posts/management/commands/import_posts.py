@@ -0,0 +1,151 @@
+import csv
+import json
+import os
+import sys
+import time
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from posts.bulk import explicit_dates, insert_posts
+from posts.caching import PAGES_SCOPE, bump_versions
+from posts.models import Group, Post
+
+User = get_user_model()
+FORMATS = ('jsonl', 'csv')
+
+
+class Command(BaseCommand):
+    help = ('Импортирует посты из JSONL или CSV (файл или stdin) пачками '
+            'bulk_create. Поля: text, author (username), group (slug), '
+            'pub_date (ISO 8601).')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', nargs='?', default='-',
+            help='Файл с постами; «-» — читать stdin.')
+        parser.add_argument('--format', choices=FORMATS)
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--checkpoint',
+            help='Файл с числом обработанных строк: продолжить с него '
+                 'и обновлять после каждой пачки.')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or (
+            'csv' if path.lower().endswith('.csv') else 'jsonl')
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size должен быть положительным')
+        checkpoint = options['checkpoint']
+        done = self.read_checkpoint(checkpoint)
+        self.verbosity = options['verbosity']
+        self.authors = dict(User.objects.values_list('username', 'pk'))
+        self.groups = dict(Group.objects.values_list('slug', 'pk'))
+        self.imported = self.skipped = 0
+        started = time.monotonic()
+        stream = (sys.stdin if path == '-'
+                  else open(path, encoding='utf-8', newline=''))
+        try:
+            rows = self.read_rows(stream, fmt, done)
+            with explicit_dates():
+                while True:
+                    batch = list(islice(rows, batch_size))
+                    if not batch:
+                        break
+                    with transaction.atomic():
+                        self.imported += insert_posts(
+                            [post for post in map(self.build_post, batch)
+                             if post is not None])
+                    done += len(batch)
+                    self.write_checkpoint(checkpoint, done)
+                    self.report(started)
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+            # Зафиксированные пачки должны стать видны и при ошибке
+            # или прерывании на середине файла.
+            bump_versions('posts', PAGES_SCOPE)
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Импортировано постов: {self.imported}, '
+            f'пропущено строк: {self.skipped}, '
+            f'{self.rate(self.imported, elapsed):.0f} строк/с'))
+
+    def read_rows(self, stream, fmt, skip):
+        """Строки входа словарями, начиная с skip-й; битые — пустыми."""
+        if fmt == 'csv':
+            yield from islice(csv.DictReader(stream), skip, None)
+            return
+        lines = islice(stream, skip, None)
+        for number, line in enumerate(lines, skip + 1):
+            try:
+                row = json.loads(line) if line.strip() else {}
+            except ValueError:
+                row = None
+            if not isinstance(row, dict):
+                self.stderr.write(f'Строка {number}: некорректный JSON')
+                row = {}
+            yield row
+
+    def build_post(self, row):
+        text = row.get('text')
+        author = row.get('author')
+        group = row.get('group') or None
+        # В JSON автор и группа могут оказаться списком или объектом:
+        # такие строки пропускаются, как и другие некорректные.
+        if not isinstance(author, str) or not isinstance(
+                group, (str, type(None))):
+            self.skipped += 1
+            return None
+        author_id = self.authors.get(author)
+        group_id = self.groups.get(group)
+        pub_date = row.get('pub_date') or None
+        try:
+            pub_date = parse_datetime(pub_date) if pub_date else (
+                timezone.now())
+        except (TypeError, ValueError):
+            pub_date = None
+        if (not text or author_id is None or pub_date is None
+                or (group is not None and group_id is None)):
+            self.skipped += 1
+            return None
+        if timezone.is_naive(pub_date):
+            pub_date = timezone.make_aware(pub_date)
+        return Post(text=text, author_id=author_id, group_id=group_id,
+                    pub_date=pub_date, updated_at=pub_date)
+
+    def read_checkpoint(self, checkpoint):
+        if not checkpoint or not os.path.exists(checkpoint):
+            return 0
+        with open(checkpoint) as file:
+            try:
+                return int(file.read().strip() or 0)
+            except ValueError:
+                raise CommandError(f'Некорректный checkpoint: {checkpoint}')
+
+    def write_checkpoint(self, checkpoint, done):
+        if not checkpoint:
+            return
+        # Через временный файл: прерванная запись не портит checkpoint.
+        temporary = f'{checkpoint}.tmp'
+        with open(temporary, 'w') as file:
+            file.write(str(done))
+        os.replace(temporary, checkpoint)
+
+    def report(self, started):
+        if self.verbosity < 2:
+            return
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            f'{self.imported} постов, '
+            f'{self.rate(self.imported, elapsed):.0f} строк/с')
+
+    @staticmethod
+    def rate(rows, elapsed):
+        return rows / elapsed if elapsed else 0
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from posts.search import FTS_TABLE, fts_available
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает полнотекстовый индекс постов пачками.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        if not fts_available():
+            raise CommandError('Полнотекстовый индекс есть только в SQLite')
+        batch_size = options['batch_size']
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('delete-all')")
+            last_id = 0
+            total = 0
+            while True:
+                cursor.execute(
+                    'SELECT id FROM posts_post WHERE id > %s '
+                    'ORDER BY id LIMIT %s', (last_id, batch_size))
+                ids = [row[0] for row in cursor.fetchall()]
+                if not ids:
+                    break
+                with transaction.atomic():
+                    cursor.execute(
+                        f'INSERT INTO {FTS_TABLE}(rowid, text) '
+                        f'SELECT id, text FROM posts_post '
+                        f'WHERE id BETWEEN %s AND %s', (ids[0], ids[-1]))
+                last_id = ids[-1]
+                total += len(ids)
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')")
+        self.stdout.write(self.style.SUCCESS(
+            f'Проиндексировано постов: {total}'))
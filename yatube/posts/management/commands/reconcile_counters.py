@@ -0,0 +1,38 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from posts.counters import recount_authors, recount_groups
+from posts.models import Group
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает счётчики постов авторов и групп пачками.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        authors = self.reconcile(User, recount_authors, batch_size)
+        groups = self.reconcile(Group, recount_groups, batch_size)
+        self.stdout.write(self.style.SUCCESS(
+            f'Пересчитано авторов: {authors}, групп: {groups}'))
+
+    def reconcile(self, model, recount, batch_size):
+        last_pk = 0
+        total = 0
+        while True:
+            ids = list(
+                model.objects.filter(pk__gt=last_pk)
+                .order_by('pk')
+                .values_list('pk', flat=True)[:batch_size]
+            )
+            if not ids:
+                return total
+            with transaction.atomic():
+                recount(ids)
+            total += len(ids)
+            last_pk = ids[-1]
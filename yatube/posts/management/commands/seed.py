@@ -0,0 +1,156 @@
+import random
+import time
+from datetime import datetime, timedelta
+from itertools import accumulate
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from posts.bulk import explicit_dates, insert_posts
+from posts.caching import PAGES_SCOPE, bump_versions
+from posts.models import Group, Post
+
+try:
+    from faker import Faker
+except ImportError:
+    Faker = None
+
+User = get_user_model()
+# Размер словаря фраз: Faker медленный, поэтому тексты постов
+# собираются из заранее сгенерированных предложений.
+SENTENCES = 5000
+
+
+def zipf_weights(count, skew):
+    """Накопленные веса «длинного хвоста»: k-й элемент ~ 1 / k ** skew."""
+    return list(accumulate(1 / rank ** skew for rank in range(1, count + 1)))
+
+
+class Command(BaseCommand):
+    help = ('Заполняет базу синтетическими пользователями, группами и '
+            'постами с реалистичными распределениями. Одинаковый --seed '
+            'даёт одинаковые данные.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--groups', type=int, default=100)
+        parser.add_argument('--posts', type=int, default=100000)
+        parser.add_argument(
+            '--years', type=int, default=5,
+            help='За сколько лет до --end распределить pub_date.')
+        parser.add_argument(
+            '--end', help='Дата последнего поста (ISO 8601), по умолчанию '
+                          'сегодня.')
+        parser.add_argument(
+            '--skew', type=float, default=1.1,
+            help='Показатель Ципфа для авторов и групп.')
+        parser.add_argument(
+            '--ungrouped', type=float, default=0.3,
+            help='Доля постов без группы.')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        if Faker is None:
+            raise CommandError('Для seed нужен пакет Faker')
+        if min(options['users'], options['batch_size']) < 1:
+            raise CommandError('Нужен хотя бы один пользователь и пачка')
+        self.verbosity = options['verbosity']
+        self.batch_size = options['batch_size']
+        seed = options['seed']
+        self.random = random.Random(seed)
+        self.fake = Faker('ru_RU')
+        self.fake.seed_instance(seed)
+        started = time.monotonic()
+        author_ids = self.create_users(options['users'], seed)
+        group_ids = self.create_groups(options['groups'], seed)
+        posts = self.create_posts(author_ids, group_ids, options)
+        bump_versions('posts', PAGES_SCOPE)
+        elapsed = time.monotonic() - started
+        rate = posts / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f'Пользователей: {len(author_ids)}, групп: {len(group_ids)}, '
+            f'постов: {posts}, {rate:.0f} постов/с'))
+
+    def create_users(self, count, seed):
+        password = make_password(None)
+        users = (
+            User(username=f'{self.fake.user_name()}_{seed}_{index}',
+                 first_name=self.fake.first_name(),
+                 last_name=self.fake.last_name(),
+                 password=password)
+            for index in range(count)
+        )
+        return self.insert(User, 'username', users)
+
+    def create_groups(self, count, seed):
+        groups = (
+            Group(title=self.fake.catch_phrase()[:200],
+                  slug=f'group-{seed}-{index}',
+                  description=self.fake.paragraph())
+            for index in range(count)
+        )
+        return self.insert(Group, 'slug', groups)
+
+    def insert(self, model, key, objects):
+        """Вставляет пачками и возвращает pk в порядке создания.
+
+        bulk_create в SQLite не возвращает pk, поэтому они читаются
+        по уникальному ключу; уже существующие строки переиспользуются.
+        """
+        ids = []
+        objects = iter(objects)
+        while True:
+            batch = [obj for _, obj in zip(range(self.batch_size), objects)]
+            if not batch:
+                return ids
+            keys = [getattr(obj, key) for obj in batch]
+            with transaction.atomic():
+                model.objects.bulk_create(batch, ignore_conflicts=True)
+                found = dict(model.objects.filter(
+                    **{f'{key}__in': keys}).values_list(key, 'pk'))
+            ids += [found[value] for value in keys]
+
+    def create_posts(self, author_ids, group_ids, options):
+        end = options['end']
+        end = parse_date(end) if end else timezone.localdate()
+        if end is None:
+            raise CommandError('Некорректная дата --end')
+        end = timezone.make_aware(datetime.combine(end, datetime.min.time()))
+        span = timedelta(days=365 * options['years']).total_seconds()
+        author_weights = zipf_weights(len(author_ids), options['skew'])
+        group_weights = zipf_weights(len(group_ids), options['skew'])
+        sentences = [self.fake.sentence() for _ in range(SENTENCES)]
+        choices, rand = self.random.choices, self.random.random
+        created = 0
+        with explicit_dates():
+            while created < options['posts']:
+                size = min(self.batch_size, options['posts'] - created)
+                authors = choices(author_ids, cum_weights=author_weights,
+                                  k=size)
+                groups = (choices(group_ids, cum_weights=group_weights,
+                                  k=size) if group_ids else [None] * size)
+                batch = []
+                for author_id, group_id in zip(authors, groups):
+                    # Плотность растёт к концу периода: постов с годами
+                    # становится больше, как на живом сайте.
+                    pub_date = end - timedelta(
+                        seconds=span * (1 - rand() ** 0.5))
+                    batch.append(Post(
+                        text=' '.join(choices(
+                            sentences, k=self.random.randint(1, 6))),
+                        author_id=author_id,
+                        group_id=(None if rand() < options['ungrouped']
+                                  else group_id),
+                        pub_date=pub_date,
+                        updated_at=pub_date,
+                    ))
+                with transaction.atomic():
+                    created += insert_posts(batch)
+                if self.verbosity > 1:
+                    self.stdout.write(f'Постов: {created}')
+        return created
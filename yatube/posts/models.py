@@ -16,6 +16,9 @@ class Group(models.Model):
                             db_index=True,
                             verbose_name='slug')
     description = models.TextField(verbose_name='Описание')
+    post_count = models.PositiveIntegerField(default=0,
+                                             editable=False,
+                                             verbose_name='Число постов')
 
     class Meta:
         verbose_name = 'Группа'
@@ -25,11 +28,22 @@ class Group(models.Model):
         return self.title
 
 
+class PostQuerySet(models.QuerySet):
+    def for_feed(self):
+        return self.select_related('author', 'group').only(
+            'text', 'pub_date', 'updated_at', 'author', 'group',
+            'author__username', 'author__first_name', 'author__last_name',
+            'group__slug', 'group__title',
+        )
+
+
 class Post(models.Model):
     text = models.TextField(verbose_name='Текст нового поста',
                             help_text='Введите текст поста')
     pub_date = models.DateTimeField(auto_now_add=True,
                                     verbose_name='Дата публикации')
+    updated_at = models.DateTimeField(auto_now=True,
+                                      verbose_name='Дата изменения')
     author = models.ForeignKey(
         User, on_delete=models.CASCADE,
         related_name='posts',
@@ -46,10 +60,37 @@ class Post(models.Model):
         help_text='Выберите группу'
     )
 
+    objects = PostQuerySet.as_manager()
+
     class Meta:
-        ordering = ('-pub_date',)
+        ordering = ('-pub_date', '-id')
+        indexes = (
+            models.Index(fields=('-pub_date', '-id'),
+                         name='post_pub_date_idx'),
+            models.Index(fields=('group', '-pub_date', '-id'),
+                         name='post_group_pub_date_idx'),
+            models.Index(fields=('author', '-pub_date', '-id'),
+                         name='post_author_pub_date_idx'),
+        )
         verbose_name = 'Пост'
         verbose_name_plural = 'Посты'
 
     def __str__(self) -> str:
         return self.text[:COUNT]
+
+
+class AuthorStats(models.Model):
+    author = models.OneToOneField(
+        User, on_delete=models.CASCADE,
+        related_name='stats',
+        verbose_name='Автор'
+    )
+    post_count = models.PositiveIntegerField(default=0,
+                                             verbose_name='Число постов')
+
+    class Meta:
+        verbose_name = 'Статистика автора'
+        verbose_name_plural = 'Статистика авторов'
+
+    def __str__(self) -> str:
+        return f'{self.author}: {self.post_count}'
@@ -0,0 +1,73 @@
+from collections import Counter
+
+from django.db import connections, transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from .caching import bump_versions
+from .counters import update_post_counters
+from .models import Post
+from .signals import bump_post_pages
+
+
+def _post_deltas(queryset):
+    """Число постов выборки по авторам и по группам одним запросом."""
+    authors, groups = Counter(), Counter()
+    rows = (queryset.order_by().values_list('author', 'group')
+            .annotate(posts=Count('id')))
+    for author_id, group_id, posts in rows:
+        authors[author_id] += posts
+        groups[group_id] += posts
+    return authors, groups
+
+
+@transaction.atomic
+def move_posts(queryset, group):
+    """Переносит посты выборки в group (None — убрать из группы).
+
+    Один UPDATE на всю выборку вместо сохранения каждого поста;
+    счётчики групп обновляются одним пакетом после него, версии кеша
+    страниц сдвигаются после фиксации транзакции (bump_versions).
+    """
+    queryset = queryset.exclude(group=group)
+    authors, groups = _post_deltas(queryset)
+    moved = queryset.update(group=group, updated_at=timezone.now())
+    if not moved:
+        return 0
+    group_deltas = {pk: -posts for pk, posts in groups.items()}
+    if group is not None:
+        group_deltas[group.pk] = moved
+    update_post_counters(group_deltas=group_deltas)
+    bump_versions('posts')
+    bump_post_pages(authors, [*groups, getattr(group, 'pk', None)])
+    return moved
+
+
+@transaction.atomic
+def delete_posts(queryset):
+    """Удаляет посты выборки одним DELETE.
+
+    Приёмники post_delete отключают быстрое удаление в Django, поэтому
+    вместо QuerySet.delete() выполняется DELETE по подзапросу выборки, а
+    сигналы по каждому посту заменены пакетным обновлением счётчиков и
+    кеша после фиксации; поисковый индекс чистят триггеры базы. На Post
+    не ссылаются другие модели, так что каскадное удаление не нужно.
+    """
+    authors, groups = _post_deltas(queryset)
+    connection = connections[queryset.db]
+    sql, params = queryset.order_by().values('pk').query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'DELETE FROM {} WHERE id IN ({})'.format(
+                connection.ops.quote_name(Post._meta.db_table), sql),
+            params)
+        deleted = cursor.rowcount
+    if not deleted:
+        return 0
+    update_post_counters(
+        {pk: -posts for pk, posts in authors.items()},
+        {pk: -posts for pk, posts in groups.items()},
+    )
+    bump_versions('posts')
+    bump_post_pages(authors, groups)
+    return deleted
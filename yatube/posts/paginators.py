@@ -0,0 +1,262 @@
+import base64
+import binascii
+import hashlib
+import json
+from types import SimpleNamespace
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.paginator import InvalidPage, Page, Paginator
+from django.db.models import Max, Q
+from django.utils.functional import cached_property
+
+from .caching import get_version
+from .const import NUM_PAG
+
+COUNT_KEY = 'posts:count:{}:{}'
+# Диапазон INTEGER в SQLite: большие числа из курсора не дойдут до запроса.
+MAX_INTEGER = 2 ** 63 - 1
+
+
+class InvalidCursor(InvalidPage):
+    pass
+
+
+class CachedCountPaginator(Paginator):
+    """Пагинатор, кеширующий COUNT(*) по сигнатуре запроса.
+
+    Кеш сбрасывается версией 'posts', которую сигналы Post поднимают
+    при сохранении и удалении. Точный подсчёт ограничен порогом
+    POSTS_APPROXIMATE_COUNT_THRESHOLD, выше него берётся оценка.
+    """
+
+    def __init__(self, object_list, per_page, *args, estimated_count=None,
+                 **kwargs):
+        super().__init__(object_list, per_page, *args, **kwargs)
+        self.estimated_count = estimated_count
+
+    @cached_property
+    def count(self):
+        query = getattr(self.object_list, 'query', None)
+        if query is None:
+            return super().count
+        sql, params = query.sql_with_params()
+        signature = hashlib.md5(f'{sql}{params}'.encode()).hexdigest()
+        key = COUNT_KEY.format(get_version('posts'), signature)
+        count = cache.get(key)
+        if count is None:
+            count = self.bounded_count()
+            cache.set(key, count, settings.POSTS_COUNT_CACHE_TIMEOUT)
+        return count
+
+    def bounded_count(self):
+        threshold = settings.POSTS_APPROXIMATE_COUNT_THRESHOLD
+        count = self.object_list.order_by()[:threshold + 1].count()
+        if count <= threshold:
+            return count
+        estimate = self.estimated_count
+        if estimate is None and not self.object_list.query.where:
+            estimate = self.object_list.aggregate(Max('pk'))['pk__max']
+        if estimate is None:
+            return self.object_list.count()
+        return max(estimate, count)
+
+
+class WindowedPage(Page):
+    ELLIPSIS = '…'
+
+    @property
+    def page_window(self):
+        """Номера страниц: окно из NUM_PAG страниц с текущей посередине,
+        первая, последняя и многоточия на месте пропусков."""
+        num_pages = self.paginator.num_pages
+        start = max(min(self.number - (NUM_PAG - 1) // 2,
+                        num_pages - NUM_PAG + 1), 1)
+        end = min(start + NUM_PAG - 1, num_pages)
+        window = list(range(start, end + 1))
+        if start > 1:
+            window[:0] = [1] if start == 2 else [1, self.ELLIPSIS]
+        if end < num_pages:
+            window += ([num_pages] if end == num_pages - 1
+                       else [self.ELLIPSIS, num_pages])
+        return window
+
+    @property
+    def previous_query(self):
+        return f'page={self.previous_page_number()}'
+
+    @property
+    def next_query(self):
+        return f'page={self.next_page_number()}'
+
+
+class WindowedPaginator(Paginator):
+    def _get_page(self, *args, **kwargs):
+        return WindowedPage(*args, **kwargs)
+
+
+class KeysetPage(WindowedPage):
+    def __init__(self, object_list, number, paginator,
+                 has_next=None, has_previous=None):
+        super().__init__(object_list, number, paginator)
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def has_next(self):
+        if self._has_next is None:
+            return super().has_next()
+        return self._has_next
+
+    def has_previous(self):
+        if self._has_previous is None:
+            return super().has_previous()
+        return self._has_previous
+
+    @property
+    def previous_query(self):
+        cursor = self.previous_cursor
+        return f'cursor={cursor}' if cursor else super().previous_query
+
+    @property
+    def next_query(self):
+        cursor = self.next_cursor
+        return f'cursor={cursor}' if cursor else super().next_query
+
+    @property
+    def next_cursor(self):
+        if not self.has_next() or not len(self):
+            return None
+        return self.paginator.encode_cursor(
+            self[-1], self.number + 1, forward=True)
+
+    @property
+    def previous_cursor(self):
+        if not self.has_previous() or not len(self):
+            return None
+        return self.paginator.encode_cursor(
+            self[0], self.number - 1, forward=False)
+
+
+class KeysetSlice:
+    """Ленивый срез ленты: строки читаются из базы частями по мере обхода,
+    курсор продолжения известен после обхода."""
+
+    chunk_size = 100
+
+    def __init__(self, paginator, object_list):
+        self.paginator = paginator
+        self.object_list = object_list
+        self.next_cursor = None
+
+    def __iter__(self):
+        last = None
+        rows = self.object_list.iterator(self.chunk_size)
+        for index, obj in enumerate(rows):
+            if index == self.paginator.per_page:
+                self.next_cursor = self.paginator.encode_cursor(last, 0)
+                return
+            last = obj
+            yield obj
+
+
+class KeysetPaginator(Paginator):
+    """Пагинатор с курсорами по ключу сортировки (по умолчанию pub_date, id).
+
+    Переход по курсору стоит одинаково на любой глубине ленты:
+    вместо OFFSET берётся WHERE по значениям ключа крайнего поста.
+    Номер страницы в курсоре — только подсказка для шаблона.
+    """
+
+    def __init__(self, object_list, per_page, *args, keys=('pub_date', 'id'),
+                 **kwargs):
+        self.keys = tuple(keys)
+        object_list = object_list.order_by(*(f'-{key}' for key in self.keys))
+        super().__init__(object_list, per_page, *args, **kwargs)
+
+    def _get_page(self, *args, **kwargs):
+        return KeysetPage(*args, **kwargs)
+
+    def _fields(self):
+        opts = self.object_list.model._meta
+        return [opts.get_field(key) for key in self.keys]
+
+    def encode_cursor(self, obj, number, forward=True):
+        if isinstance(obj, dict):
+            # Строки из .values(): ключи совпадают с именами полей.
+            obj = SimpleNamespace(**obj)
+        payload = [number, 'n' if forward else 'p']
+        payload += [field.value_to_string(obj) for field in self._fields()]
+        cursor = base64.urlsafe_b64encode(json.dumps(payload).encode())
+        return cursor.decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            number, direction, *values = json.loads(raw.decode())
+            number = max(int(number), 1)
+            if direction not in ('n', 'p') or len(values) != len(self.keys):
+                raise ValueError
+            values = [field.to_python(value)
+                      for field, value in zip(self._fields(), values)]
+            if any(isinstance(value, int) and abs(value) > MAX_INTEGER
+                   for value in values):
+                raise ValueError
+        except (ValueError, TypeError, OverflowError, binascii.Error,
+                ValidationError):
+            raise InvalidCursor('Некорректный курсор страницы')
+        return number, direction == 'n', values
+
+    def _keyset_filter(self, values, forward):
+        lookup = 'lt' if forward else 'gt'
+        condition = Q()
+        for index, key in enumerate(self.keys):
+            equal = dict(zip(self.keys[:index], values))
+            equal[f'{key}__{lookup}'] = values[index]
+            condition |= Q(**equal)
+        # Диапазон по первому ключу отдельно от OR-условия,
+        # иначе SQLite не может пройти составной индекс по порядку.
+        bound = Q(**{f'{self.keys[0]}__{lookup}e': values[0]})
+        return bound & condition
+
+    def cursor_page(self, cursor):
+        number, forward, values = self.decode_cursor(cursor)
+        object_list = self.object_list.filter(
+            self._keyset_filter(values, forward))
+        if not forward:
+            object_list = object_list.reverse()
+        object_list = list(object_list[:self.per_page + 1])
+        has_more = len(object_list) > self.per_page
+        object_list = object_list[:self.per_page]
+        if forward:
+            if not object_list:
+                return self.page(1)
+            return self._get_page(object_list, number, self,
+                                  has_next=has_more, has_previous=True)
+        if not has_more:
+            return self.page(1)
+        object_list.reverse()
+        return self._get_page(object_list, max(number, 2), self,
+                              has_next=True, has_previous=True)
+
+    def slice_after(self, cursor=None):
+        """До per_page объектов после курсора — без COUNT и номеров страниц.
+
+        Курсор разбирается сразу, чтобы ошибка не всплыла посреди ответа.
+        """
+        object_list = self.object_list
+        if cursor:
+            _, _, values = self.decode_cursor(cursor)
+            object_list = object_list.filter(
+                self._keyset_filter(values, forward=True))
+        return KeysetSlice(self, object_list[:self.per_page + 1])
+
+    def get_cursor_page(self, cursor):
+        try:
+            return self.cursor_page(cursor)
+        except InvalidCursor:
+            return self.page(1)
+
+
+class FeedPaginator(KeysetPaginator, CachedCountPaginator):
+    pass
@@ -0,0 +1,60 @@
+from django.db import connection
+from django.db.models.expressions import RawSQL
+
+from .models import Post
+
+FTS_TABLE = 'posts_post_fts'
+MATCH_SQL = f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s'
+
+
+def fts_available():
+    return connection.vendor == 'sqlite'
+
+
+def fts_query(query):
+    # Каждое слово — отдельная фраза: пользовательский ввод
+    # не должен разбираться как синтаксис запросов FTS5.
+    return ' '.join(
+        '"{}"'.format(term.replace('"', '""')) for term in query.split())
+
+
+class SearchResults:
+    """Посты, найденные FTS5, по убыванию релевантности.
+
+    Поддерживает count() и срезы, поэтому передаётся в Paginator:
+    на страницу уходит один запрос к индексу и один за постами.
+    """
+
+    def __init__(self, query):
+        self.match = fts_query(query)
+
+    def count(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT COUNT(*) FROM {FTS_TABLE} '
+                f'WHERE {FTS_TABLE} MATCH %s', (self.match,))
+            return cursor.fetchone()[0]
+
+    def __getitem__(self, item):
+        if not isinstance(item, slice):
+            return self[item:item + 1][0]
+        start = item.start or 0
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'{MATCH_SQL} ORDER BY rank LIMIT %s OFFSET %s',
+                (self.match, item.stop - start, start))
+            ids = [row[0] for row in cursor.fetchall()]
+        posts = Post.objects.for_feed().in_bulk(ids)
+        return [posts[pk] for pk in ids if pk in posts]
+
+
+def search_posts(query):
+    if not fts_available():
+        return Post.objects.for_feed().filter(text__icontains=query)
+    return SearchResults(query)
+
+
+def filter_by_search(queryset, query):
+    if not fts_available():
+        return queryset.filter(text__icontains=query)
+    return queryset.filter(pk__in=RawSQL(MATCH_SQL, (fts_query(query),)))
@@ -0,0 +1,99 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_init, post_save
+from django.db.models.signals import pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .caching import (AUTHOR_SCOPE, GROUP_SCOPE, INDEX_SCOPE, PAGES_SCOPE,
+                      bump_versions)
+from .counters import update_post_counters
+from .models import Group, Post
+
+User = get_user_model()
+UNKNOWN = object()
+# Поля, которые выводятся в карточках постов.
+CARD_FIELDS = {
+    Group: ('title', 'slug'),
+    User: ('username', 'first_name', 'last_name'),
+}
+
+
+def bump_post_pages(author_ids, group_ids):
+    """Сбрасывает кеш страниц главной, групп и авторов постов."""
+    group_ids = set(group_ids) - {None}
+    slugs = Group.objects.filter(
+        pk__in=group_ids).values_list('slug', flat=True)
+    usernames = User.objects.filter(
+        pk__in=set(author_ids)).values_list('username', flat=True)
+    bump_versions(
+        INDEX_SCOPE,
+        *(GROUP_SCOPE.format(slug=slug) for slug in slugs),
+        *(AUTHOR_SCOPE.format(username=name) for name in usernames),
+    )
+
+
+@receiver(post_init, sender=Post)
+def remember_group(sender, instance, **kwargs):
+    instance._saved_group_id = instance.__dict__.get('group_id', UNKNOWN)
+
+
+@receiver(pre_save, sender=Post)
+def load_saved_group(sender, instance, **kwargs):
+    if instance.pk is not None and instance._saved_group_id is UNKNOWN:
+        instance._saved_group_id = sender.objects.filter(
+            pk=instance.pk).values_list('group_id', flat=True).first()
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, created, **kwargs):
+    saved_group_id = instance._saved_group_id
+    if created:
+        update_post_counters({instance.author_id: 1}, {instance.group_id: 1})
+        bump_versions('posts')
+    elif saved_group_id != instance.group_id:
+        update_post_counters(group_deltas={
+            saved_group_id: -1,
+            instance.group_id: 1,
+        })
+        bump_versions('posts')
+    bump_post_pages([instance.author_id], [saved_group_id, instance.group_id])
+    instance._saved_group_id = instance.group_id
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    update_post_counters({instance.author_id: -1}, {instance.group_id: -1})
+    bump_versions('posts')
+    bump_post_pages([instance.author_id], [instance.group_id])
+
+
+def card_fields(sender, instance):
+    return tuple(instance.__dict__.get(name) for name in CARD_FIELDS[sender])
+
+
+@receiver(post_init, sender=Group)
+@receiver(post_init, sender=User)
+def remember_card_fields(sender, instance, **kwargs):
+    instance._saved_card_fields = card_fields(sender, instance)
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_save, sender=User)
+def refresh_cards(sender, instance, created, **kwargs):
+    fields = card_fields(sender, instance)
+    if not created and fields != instance._saved_card_fields:
+        lookup = 'group' if sender is Group else 'author'
+        Post.objects.filter(**{lookup: instance}).update(
+            updated_at=timezone.now())
+        bump_versions(PAGES_SCOPE)
+    elif sender is Group:
+        bump_versions(GROUP_SCOPE.format(slug=instance.slug))
+    elif created:
+        bump_versions(AUTHOR_SCOPE.format(username=instance.username))
+    instance._saved_card_fields = fields
+
+
+@receiver(post_delete, sender=Group)
+@receiver(post_delete, sender=User)
+def drop_pages(sender, instance, **kwargs):
+    bump_versions(PAGES_SCOPE)
@@ -0,0 +1,28 @@
+from django import template
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from posts.caching import CARD_TEMPLATE, card_cache_stats, card_key
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def post_card(context, post, show_author=False, show_group=False):
+    last = context.get('forloop', {}).get('last', True)
+    key = card_key(post, show_author, show_group, last)
+    card = cache.get(key)
+    if card is not None:
+        card_cache_stats['hits'] += 1
+        return mark_safe(card)
+    card_cache_stats['misses'] += 1
+    card = render_to_string(CARD_TEMPLATE, {
+        'post': post,
+        'show_author': show_author,
+        'show_group': show_group,
+        'forloop': {'last': last},
+    })
+    cache.set(key, card, settings.POSTS_CARD_CACHE_TIMEOUT)
+    return card
@@ -0,0 +1,191 @@
+from django.contrib.admin.models import DELETION, LogEntry
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..admin import LOG_IDS
+from ..caching import GROUP_SCOPE, get_version
+from ..models import AuthorStats, Group, Post
+from ..moderation import move_posts
+from .utils import committed
+
+User = get_user_model()
+
+
+class PostAdminTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.admin = User.objects.create_superuser(
+            username='admin', email='admin@yatube.ru', password='admin')
+        cls.post = Post.objects.create(
+            text='Пост о котиках', author=cls.admin)
+        Post.objects.create(text='Пост о погоде', author=cls.admin)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.admin)
+
+    def changelist_queries(self):
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('admin:posts_post_changelist'))
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_changelist_queries_do_not_grow_with_rows(self):
+        """Число запросов списка постов не зависит от числа строк."""
+        before = self.changelist_queries()
+        for index in range(5):
+            author = User.objects.create_user(username=f'author{index}')
+            group = Group.objects.create(
+                title=f'Группа {index}', slug=f'group-{index}')
+            Post.objects.create(
+                text=f'Пост {index}', author=author, group=group)
+        self.assertEqual(self.changelist_queries(), before)
+
+    def test_changelist_group_is_autocomplete(self):
+        """Группа в списке редактируется автокомплитом с выбранным
+        значением, а не полным списком групп."""
+        group = Group.objects.create(title='Котики', slug='cats')
+        Group.objects.create(title='Погода', slug='weather')
+        Post.objects.filter(pk=self.post.pk).update(group=group)
+        response = self.client.get(reverse('admin:posts_post_changelist'))
+        self.assertContains(response, 'admin-autocomplete')
+        self.assertContains(response, 'Котики')
+        self.assertNotContains(response, 'Погода')
+
+    def test_changelist_has_no_full_count(self):
+        """Список не считает общее число постов и показывает даты."""
+        response = self.client.get(reverse('admin:posts_post_changelist'))
+        cl = response.context['cl']
+        self.assertIsNone(cl.full_result_count)
+        self.assertEqual(cl.result_count, 2)
+        self.assertContains(response, 'toplinks')
+
+    def test_changelist_search_uses_index(self):
+        """Поиск в админке находит посты через полнотекстовый индекс."""
+        response = self.client.get(
+            reverse('admin:posts_post_changelist'), {'q': 'котиках'})
+        self.assertEqual(
+            list(response.context['cl'].result_list), [self.post])
+
+
+class PostAdminActionsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.admin = User.objects.create_superuser(
+            username='admin', email='admin@yatube.ru', password='admin')
+        cls.author = User.objects.create_user(username='auth')
+        cls.cats = Group.objects.create(title='Котики', slug='cats')
+        cls.dogs = Group.objects.create(title='Собаки', slug='dogs')
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.admin)
+        self.posts = [
+            Post.objects.create(
+                text=f'Пост о котиках {index}', author=self.author,
+                group=self.cats)
+            for index in range(3)
+        ]
+        self.other = Post.objects.create(
+            text='Пост о погоде', author=self.admin)
+
+    def run_action(self, action, posts=(), data=None, query=''):
+        url = reverse('admin:posts_post_changelist') + query
+        return self.client.post(url, {
+            'action': action,
+            'select_across': '1' if not posts else '0',
+            '_selected_action': [post.pk for post in posts] or [0],
+            **(data or {}),
+        })
+
+    def test_assign_group_asks_for_group(self):
+        """Перенос в группу сначала показывает форму выбора группы."""
+        response = self.run_action('assign_group', self.posts[:2])
+        self.assertTemplateUsed(response, 'admin/posts/post/bulk_action.html')
+        self.assertEqual(response.context['count'], 2)
+        self.assertIn('group', response.context['form'].fields)
+
+    def test_assign_group_moves_posts_and_counters(self):
+        """Перенос в группу меняет группу постов и счётчики групп."""
+        response = self.run_action(
+            'assign_group', self.posts[:2],
+            {'apply': '1', 'group': self.dogs.pk})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(
+            Post.objects.filter(group=self.dogs).count(), 2)
+        self.cats.refresh_from_db()
+        self.dogs.refresh_from_db()
+        self.assertEqual(self.cats.post_count, 1)
+        self.assertEqual(self.dogs.post_count, 2)
+
+    def test_clear_group_refreshes_group_page(self):
+        """Снятие группы сразу видно на странице группы."""
+        url = reverse('posts:group_list', args=(self.cats.slug,))
+        self.assertEqual(
+            len(self.client.get(url).context['page_obj']), 3)
+        self.run_action('clear_group', self.posts)
+        self.assertEqual(len(self.client.get(url).context['page_obj']), 0)
+        self.cats.refresh_from_db()
+        self.assertEqual(self.cats.post_count, 0)
+
+    def test_delete_posts_across_filtered_changelist(self):
+        """Удаление по всему отфильтрованному списку одним DELETE
+        обновляет счётчики и поисковый индекс."""
+        response = self.run_action(
+            'delete_posts', query=f'?group__id__exact={self.cats.pk}')
+        self.assertEqual(response.context['count'], 3)
+        self.assertTrue(Post.objects.filter(group=self.cats).exists())
+        with CaptureQueriesContext(connection) as queries:
+            self.run_action(
+                'delete_posts', data={'apply': '1'},
+                query=f'?group__id__exact={self.cats.pk}')
+        deletes = [query['sql'] for query in queries
+                   if query['sql'].startswith('DELETE')]
+        self.assertEqual(len(deletes), 1)
+        self.assertEqual(list(Post.objects.all()), [self.other])
+        self.cats.refresh_from_db()
+        self.assertEqual(self.cats.post_count, 0)
+        self.assertEqual(
+            AuthorStats.objects.get(author=self.author).post_count, 0)
+        response = self.client.get(
+            reverse('posts:search'), {'q': 'котиках'})
+        self.assertEqual(len(response.context['page_obj']), 0)
+        entry = LogEntry.objects.get()
+        self.assertEqual(entry.action_flag, DELETION)
+        self.assertEqual(entry.user, self.admin)
+        self.assertEqual(entry.object_repr, 'Удалено постов: 3')
+        self.assertEqual(entry.change_message, 'id: {}; фильтр: {}'.format(
+            ', '.join(str(post.pk) for post in self.posts),
+            f'group__id__exact={self.cats.pk}'))
+
+    def test_log_keeps_id_sample(self):
+        """В журнал попадает не больше LOG_IDS id, а не вся выборка."""
+        Post.objects.bulk_create(
+            Post(text=f'Пост {index}', author=self.author)
+            for index in range(LOG_IDS))
+        self.run_action('assign_group', data={
+            'apply': '1', 'group': self.dogs.pk})
+        entry = LogEntry.objects.get()
+        self.assertEqual(entry.object_repr,
+                         f'Перенесено в «{self.dogs}» постов: '
+                         f'{LOG_IDS + 4}')
+        ids = list(Post.objects.order_by('pk').values_list('pk', flat=True))
+        self.assertEqual(entry.change_message, 'id: {}, …'.format(
+            ', '.join(map(str, ids[:LOG_IDS]))))
+
+    def test_cache_bumped_after_commit(self):
+        """Версии кеша групп сдвигаются только после фиксации."""
+        scope = GROUP_SCOPE.format(slug=self.dogs.slug)
+        version = get_version(scope)
+        with committed():
+            with transaction.atomic():
+                move_posts(Post.objects.filter(group=self.cats), self.dogs)
+                self.assertEqual(get_version(scope), version)
+        self.assertNotEqual(get_version(scope), version)
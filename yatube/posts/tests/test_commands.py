@@ -0,0 +1,259 @@
+import csv
+import gzip
+import json
+import os
+import tempfile
+from datetime import datetime
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import DatabaseError, connection
+from django.test import TestCase
+from django.utils import timezone
+
+from ..bulk import insert_posts
+from ..caching import PAGES_SCOPE, get_version
+from ..models import AuthorStats, Group, Post
+from .utils import committed
+
+User = get_user_model()
+
+
+class ReconcileCountersCommandTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.users = [User.objects.create_user(username=f'user_{i}')
+                     for i in range(3)]
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        Post.objects.bulk_create([
+            Post(text=f'Пост {i}', author=cls.users[i % 2], group=cls.group)
+            for i in range(5)
+        ])
+
+    def test_reconcile_counters(self):
+        """Команда пересчитывает счётчики, пропущенные bulk_create."""
+        call_command('reconcile_counters', batch_size=2, stdout=StringIO())
+        expected = {self.users[0]: 3, self.users[1]: 2, self.users[2]: 0}
+        for user, count in expected.items():
+            with self.subTest(user=user):
+                self.assertEqual(
+                    AuthorStats.objects.get(author=user).post_count, count)
+        self.group.refresh_from_db()
+        self.assertEqual(self.group.post_count, 5)
+
+
+class RebuildSearchIndexCommandTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        for i in range(5):
+            Post.objects.create(text=f'Пост номер{i}', author=cls.user)
+
+    def test_rebuild_search_index(self):
+        """Команда заново наполняет очищенный индекс поиска."""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "INSERT INTO posts_post_fts(posts_post_fts) "
+                "VALUES ('delete-all')")
+        call_command('rebuild_search_index', batch_size=2, stdout=StringIO())
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT rowid FROM posts_post_fts "
+                "WHERE posts_post_fts MATCH 'номер3'")
+            rows = cursor.fetchall()
+        self.assertEqual(
+            rows, [(Post.objects.get(text='Пост номер3').pk,)])
+
+
+class ImportPostsCommandTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(title='Котики', slug='cats')
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def write(self, name, content):
+        path = os.path.join(self.directory.name, name)
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(content)
+        return path
+
+    def jsonl(self, rows):
+        return self.write('posts.jsonl', ''.join(
+            json.dumps(row, ensure_ascii=False) + '\n' for row in rows))
+
+    def test_import_jsonl(self):
+        """Посты импортируются с исходными датами и счётчиками."""
+        path = self.jsonl([
+            {'text': 'Старый пост', 'author': 'auth', 'group': 'cats',
+             'pub_date': '2015-03-01T10:00:00+00:00'},
+            {'text': 'Без группы', 'author': 'auth'},
+            {'text': 'Чужой автор', 'author': 'nobody'},
+            {'text': 'Чужая группа', 'author': 'auth', 'group': 'dogs'},
+            {'text': 'Автор списком', 'author': ['auth']},
+            {'text': 'Группа объектом', 'author': 'auth',
+             'group': {'slug': 'cats'}},
+        ])
+        out = StringIO()
+        call_command('import_posts', path, batch_size=1, stdout=out,
+                     stderr=StringIO())
+        self.assertIn('Импортировано постов: 2', out.getvalue())
+        self.assertIn('пропущено строк: 4', out.getvalue())
+        post = Post.objects.get(text='Старый пост')
+        expected = timezone.make_aware(
+            datetime(2015, 3, 1, 10), timezone.utc)
+        self.assertEqual(post.pub_date, expected)
+        self.assertEqual(post.updated_at, expected)
+        self.assertEqual(post.group, self.group)
+        self.assertEqual(
+            AuthorStats.objects.get(author=self.user).post_count, 2)
+        self.group.refresh_from_db()
+        self.assertEqual(self.group.post_count, 1)
+
+    def test_import_csv(self):
+        """CSV читается по заголовку."""
+        path = self.write(
+            'posts.csv',
+            'text,author,group,pub_date\n'
+            '"Пост, с запятой",auth,cats,2020-01-01T00:00:00\n'
+            'Второй,auth,,\n',
+        )
+        call_command('import_posts', path, stdout=StringIO())
+        self.assertTrue(Post.objects.filter(
+            text='Пост, с запятой', group=self.group).exists())
+        self.assertTrue(Post.objects.filter(
+            text='Второй', group=None).exists())
+
+    def test_resume_from_checkpoint(self):
+        """Повторный запуск продолжает импорт с checkpoint."""
+        path = self.jsonl(
+            {'text': f'Пост {i}', 'author': 'auth'} for i in range(5))
+        checkpoint = os.path.join(self.directory.name, 'checkpoint')
+        self.write('checkpoint', '3')
+        call_command('import_posts', path, checkpoint=checkpoint,
+                     batch_size=2, stdout=StringIO())
+        self.assertEqual(
+            sorted(Post.objects.values_list('text', flat=True)),
+            ['Пост 3', 'Пост 4'])
+        with open(checkpoint) as file:
+            self.assertEqual(file.read(), '5')
+
+    def test_failed_import_refreshes_cache(self):
+        """Ошибка посреди файла не прячет уже зафиксированные пачки
+        за старой версией кеша."""
+        path = self.jsonl(
+            {'text': f'Пост {i}', 'author': 'auth'} for i in range(3))
+        batches = iter([insert_posts, DatabaseError('database is locked')])
+
+        def insert(posts):
+            batch = next(batches)
+            if isinstance(batch, Exception):
+                raise batch
+            return batch(posts)
+
+        version = get_version(PAGES_SCOPE)
+        with committed(), self.assertRaises(DatabaseError), mock.patch(
+                'posts.management.commands.import_posts.insert_posts',
+                insert):
+            call_command('import_posts', path, batch_size=2,
+                         stdout=StringIO())
+        self.assertEqual(Post.objects.count(), 2)
+        self.assertNotEqual(get_version(PAGES_SCOPE), version)
+
+
+class ExportPostsCommandTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.other = User.objects.create_user(username='other')
+        cls.group = Group.objects.create(title='Котики', slug='cats')
+        for year in (2019, 2020, 2021):
+            post = Post.objects.create(
+                text=f'Пост {year}', author=cls.user, group=cls.group)
+            Post.objects.filter(pk=post.pk).update(
+                pub_date=timezone.make_aware(datetime(year, 6, 1)))
+        Post.objects.create(text='Чужой пост', author=cls.other)
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def export(self, name, **options):
+        path = os.path.join(self.directory.name, name)
+        call_command('export_posts', path, stdout=StringIO(), **options)
+        return path
+
+    def test_export_jsonl_with_filters(self):
+        """Выгрузка фильтруется по группе, автору и диапазону дат."""
+        path = self.export('posts.jsonl', group='cats', author='auth',
+                           since='2020-01-01', until='2021-01-01')
+        with open(path, encoding='utf-8') as file:
+            rows = [json.loads(line) for line in file]
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['text'], 'Пост 2020')
+        self.assertEqual(rows[0]['author'], 'auth')
+        self.assertEqual(rows[0]['group'], 'cats')
+
+    def test_export_gzip_csv(self):
+        """CSV сжимается по расширению .gz и идёт по возрастанию дат."""
+        path = self.export('posts.csv.gz', chunk_size=2)
+        with gzip.open(path, 'rt', encoding='utf-8', newline='') as file:
+            rows = list(csv.DictReader(file))
+        self.assertEqual(
+            [row['text'] for row in rows],
+            ['Пост 2019', 'Пост 2020', 'Пост 2021', 'Чужой пост'])
+
+    def test_export_roundtrip(self):
+        """Выгрузка читается командой import_posts."""
+        path = self.export('posts.jsonl', author='auth')
+        Post.objects.all().delete()
+        call_command('import_posts', path, stdout=StringIO())
+        self.assertEqual(
+            list(Post.objects.values_list('text', 'pub_date__year')),
+            [('Пост 2021', 2021), ('Пост 2020', 2020), ('Пост 2019', 2019)])
+
+
+class SeedCommandTest(TestCase):
+    def seed(self, **options):
+        call_command('seed', users=5, groups=3, posts=60, years=2,
+                     end='2022-01-01', batch_size=25, stdout=StringIO(),
+                     **options)
+        return list(Post.objects.order_by('pk').values_list(
+            'text', 'author__username', 'group__slug', 'pub_date'))
+
+    def test_seed_creates_skewed_data(self):
+        """Данные распределены по годам, а авторы неравномерно."""
+        posts = self.seed()
+        self.assertEqual(User.objects.count(), 5)
+        self.assertEqual(Group.objects.count(), 3)
+        self.assertEqual(len(posts), 60)
+        end = timezone.make_aware(datetime(2022, 1, 1))
+        dates = [post[3] for post in posts]
+        self.assertLessEqual(max(dates), end)
+        self.assertGreaterEqual(min(dates), end.replace(year=2020))
+        stats = sorted(
+            AuthorStats.objects.values_list('post_count', flat=True))
+        self.assertEqual(sum(stats), 60)
+        self.assertGreater(stats[-1], stats[0])
+        self.assertEqual(
+            sum(Group.objects.values_list('post_count', flat=True)),
+            Post.objects.exclude(group=None).count())
+
+    def test_seed_is_deterministic(self):
+        """Одинаковый seed даёт одинаковые посты."""
+        first = self.seed(seed=7)
+        Post.objects.all().delete()
+        self.assertEqual(self.seed(seed=7), first)
@@ -1,8 +1,10 @@
 from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test import TestCase
 
-from ..models import Group, Post
-from ..const import TEXT_LEN
+from ..models import AuthorStats, Group, Post
+from ..const import NUM_POST, TEXT_LEN
+from ..paginators import KeysetPaginator
 
 User = get_user_model()
 
@@ -67,3 +69,101 @@ class GroupModelTest(TestCase):
     def test_group_str(self):
         """Тест: __str__ у group."""
         self.assertEqual(self.group.title, str(self.group))
+
+
+class PostIndexesTest(TestCase):
+    """Ленты читаются по индексу, без сортировки во временном B-дереве."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        for i in range(NUM_POST + 1):
+            Post.objects.create(
+                text=f'Тестовый пост {i}',
+                author=cls.user,
+                group=cls.group,
+            )
+
+    def query_plan(self, queryset):
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+            return ' '.join(row[-1] for row in cursor.fetchall())
+
+    def test_feed_queries_use_index(self):
+        """Все запросы лент, в том числе по курсору, идут по индексу."""
+        feeds = {
+            'index': Post.objects.for_feed(),
+            'group_list': self.group.posts.for_feed(),
+            'profile': self.user.posts.for_feed(),
+        }
+        for name, posts in feeds.items():
+            paginator = KeysetPaginator(posts, NUM_POST)
+            page_obj = paginator.page(1)
+            cursor_values = [page_obj[-1].pub_date, page_obj[-1].id]
+            queries = {
+                'page': paginator.object_list[:NUM_POST],
+                'next': paginator.object_list.filter(
+                    paginator._keyset_filter(cursor_values, True)),
+                'previous': paginator.object_list.filter(
+                    paginator._keyset_filter(cursor_values, False)
+                ).reverse(),
+            }
+            for kind, queryset in queries.items():
+                with self.subTest(feed=name, query=kind):
+                    plan = self.query_plan(queryset[:NUM_POST + 1])
+                    self.assertIn('USING INDEX post_', plan)
+                    self.assertNotIn('TEMP B-TREE', plan)
+
+
+class PostCountersTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.group_new = Group.objects.create(
+            title='Новая группа',
+            slug='test-slug-new',
+            description='Тестовое описание',
+        )
+
+    def assertCounters(self, author_count, group_count, group_new_count):
+        self.assertEqual(
+            AuthorStats.objects.get(author=self.user).post_count,
+            author_count)
+        self.group.refresh_from_db()
+        self.group_new.refresh_from_db()
+        self.assertEqual(self.group.post_count, group_count)
+        self.assertEqual(self.group_new.post_count, group_new_count)
+
+    def test_counters_follow_create_move_delete(self):
+        """Счётчики меняются при создании, смене группы и удалении."""
+        post = Post.objects.create(
+            text='Тестовый пост', author=self.user, group=self.group)
+        Post.objects.create(text='Пост без группы', author=self.user)
+        self.assertCounters(2, 1, 0)
+        post.group = self.group_new
+        post.save()
+        self.assertCounters(2, 0, 1)
+        post.delete()
+        self.assertCounters(1, 0, 0)
+
+    def test_group_change_on_deferred_post(self):
+        """Смена группы учитывается и у поста с отложенным полем группы."""
+        post = Post.objects.create(
+            text='Тестовый пост', author=self.user, group=self.group)
+        post = Post.objects.only('text').get(pk=post.pk)
+        post.group = self.group_new
+        post.save()
+        self.assertCounters(1, 0, 1)
@@ -1,12 +1,39 @@
+import base64
+import threading
+import time
+from http import HTTPStatus
+from unittest import mock
+
 from django import forms
 from django.contrib.auth import get_user_model
-from django.test import Client, TestCase
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import IntegrityError, connection, transaction
+from django.test import (Client, TestCase, TransactionTestCase,
+                         override_settings)
 from django.urls import reverse
 
+from core.metrics import registry
+
+from ..caching import (GROUP_SCOPE, INDEX_SCOPE, card_cache_stats,
+                       card_key, card_template_version, get_versions,
+                       version_key)
+from ..checks import fts_triggers
 from ..models import Group, Post
-from ..const import NUM_POST, NUM_PAG
+from ..counters import update_post_counters
+from ..const import NUM_FEED, NUM_PAG, NUM_POST
+from ..paginators import CachedCountPaginator, KeysetPage
+from ..writer import save, writer
+from .utils import committed
 
 User = get_user_model()
+# Курсоры с числами вне диапазона int и INTEGER SQLite.
+OVERFLOW_CURSORS = tuple(
+    base64.urlsafe_b64encode(raw.encode()).decode() for raw in (
+        '[1e999,"n","2020-01-01T00:00:00+00:00","1"]',
+        f'[2,"n","2020-01-01T00:00:00+00:00","{10 ** 30}"]',
+    )
+)
 
 
 class PostPagesTests(TestCase):
@@ -26,6 +53,7 @@ class PostPagesTests(TestCase):
         )
 
     def setUp(self):
+        cache.clear()
         self.authorized_client = Client()
         self.authorized_client.force_login(self.user)
 
@@ -185,6 +213,9 @@ class PaginatorViewsTest(TestCase):
             author=cls.user)
             for i in range(cls.POSTS_COUNT)])
 
+    def setUp(self):
+        cache.clear()
+
     def test_first_page_contains_ten_records(self):
         """Тестируем Paginator.Первые 10 постов на первой странице index"""
         response = self.client.get(reverse('posts:index'))
@@ -195,4 +226,549 @@ class PaginatorViewsTest(TestCase):
         """Тестируем Paginator.Последние 3 поста на второй странице index"""
         response = self.client.get(reverse('posts:index') + '?page=2')
         self.assertEqual(
-            len(response.context.get('page_obj').object_list), NUM_PAG)
+            len(response.context.get('page_obj').object_list),
+            self.POSTS_COUNT - NUM_POST)
+
+    def test_next_cursor_contains_remaining_records(self):
+        """Курсор «Следующая» ведёт на оставшиеся 3 поста index."""
+        response = self.client.get(reverse('posts:index'))
+        first_page = response.context.get('page_obj')
+        response = self.client.get(
+            reverse('posts:index'), {'cursor': first_page.next_cursor})
+        page_obj = response.context.get('page_obj')
+        self.assertEqual(
+            len(page_obj.object_list), self.POSTS_COUNT - NUM_POST)
+        self.assertEqual(page_obj.number, 2)
+        self.assertFalse(page_obj.has_next())
+        self.assertTrue(set(first_page).isdisjoint(page_obj))
+
+    def test_previous_cursor_returns_first_page(self):
+        """Курсор «Предыдущая» возвращает на первую страницу index."""
+        response = self.client.get(reverse('posts:index') + '?page=2')
+        response = self.client.get(
+            reverse('posts:index'),
+            {'cursor': response.context.get('page_obj').previous_cursor})
+        page_obj = response.context.get('page_obj')
+        first_page = Post.objects.all()[:NUM_POST]
+        self.assertEqual(page_obj.number, 1)
+        self.assertFalse(page_obj.has_previous())
+        self.assertEqual(list(page_obj), list(first_page))
+
+    def test_invalid_cursor_returns_first_page(self):
+        """Некорректный курсор не ломает страницу."""
+        for cursor in ('not-a-cursor', *OVERFLOW_CURSORS):
+            with self.subTest(cursor=cursor):
+                response = self.client.get(
+                    reverse('posts:index'), {'cursor': cursor})
+                page_obj = response.context.get('page_obj')
+                self.assertEqual(page_obj.number, 1)
+                self.assertEqual(len(page_obj.object_list), NUM_POST)
+
+
+class PageWindowTest(TestCase):
+    """Пагинатор выводит окно из NUM_PAG страниц с текущей посередине."""
+    NUM_PAGES = 50
+
+    def page(self, number):
+        paginator = Paginator(range(self.NUM_PAGES * NUM_POST), NUM_POST)
+        return KeysetPage([], number, paginator)
+
+    def test_window_in_the_middle(self):
+        """В середине окно окружено первой, последней и многоточиями."""
+        number = self.NUM_PAGES // 2
+        start = number - (NUM_PAG - 1) // 2
+        self.assertEqual(
+            self.page(number).page_window,
+            [1, KeysetPage.ELLIPSIS]
+            + list(range(start, start + NUM_PAG))
+            + [KeysetPage.ELLIPSIS, self.NUM_PAGES])
+
+    def test_window_size(self):
+        """Окно всегда из NUM_PAG страниц, в том числе у краёв."""
+        for number in (1, 2, self.NUM_PAGES // 2, self.NUM_PAGES):
+            with self.subTest(number=number):
+                window = [page for page in self.page(number).page_window
+                          if page != KeysetPage.ELLIPSIS]
+                self.assertIn(number, window)
+                self.assertLessEqual(len(window), NUM_PAG + 2)
+
+    def test_window_at_the_edges(self):
+        """У краёв окно не дублирует первую и последнюю страницы."""
+        self.assertEqual(
+            self.page(1).page_window,
+            list(range(1, NUM_PAG + 1))
+            + [KeysetPage.ELLIPSIS, self.NUM_PAGES])
+        self.assertEqual(
+            self.page(self.NUM_PAGES).page_window,
+            [1, KeysetPage.ELLIPSIS]
+            + list(range(self.NUM_PAGES - NUM_PAG + 1, self.NUM_PAGES + 1)))
+
+    def test_few_pages(self):
+        """Если страниц меньше окна, выводятся все."""
+        paginator = Paginator(range(2 * NUM_POST), NUM_POST)
+        self.assertEqual(KeysetPage([], 1, paginator).page_window, [1, 2])
+
+
+class FeedQueriesTest(TestCase):
+    """Число запросов на страницу ленты не зависит от числа постов."""
+    POSTS_COUNT = 13
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.group = Group.objects.create(
+            title='Группа для ленты',
+            slug='feed-slug',
+            description='описание',
+        )
+        cls.users = [
+            User.objects.create(username=f'feed_user_{i}',
+                                first_name=f'Имя{i}', last_name='Фамилия')
+            for i in range(3)
+        ]
+        for i in range(cls.POSTS_COUNT):
+            Post.objects.create(
+                text=f'Пост ленты {i}',
+                author=cls.users[i % len(cls.users)],
+                group=cls.group,
+            )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_feed_pages_query_count(self):
+        """Index, группа и профиль рендерятся за фиксированное число
+        запросов (включая запрос для ETag), повторно — без COUNT(*)."""
+        pages_queries = {
+            reverse('posts:index'): 3,
+            reverse('posts:group_list',
+                    kwargs={'slug': self.group.slug}): 4,
+            reverse('posts:profile',
+                    kwargs={'username': self.users[0].username}): 4,
+        }
+        for url, queries in pages_queries.items():
+            with self.subTest(url=url):
+                with self.assertNumQueries(queries):
+                    self.client.get(url)
+                with self.assertNumQueries(queries - 1):
+                    self.client.get(url)
+
+    def test_feed_cards_contain_author_and_group(self):
+        """Карточки ленты содержат данные автора и группы."""
+        response = self.client.get(reverse('posts:index'))
+        self.assertContains(response, self.users[0].get_full_name())
+        self.assertContains(response, self.group.title)
+
+
+class CachedCountPaginatorTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        for i in range(NUM_POST):
+            Post.objects.create(text=f'Пост {i}', author=cls.user)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_count_cached_until_post_saved(self):
+        """Кешированный COUNT(*) сбрасывается при создании и удалении
+        поста."""
+        self.assertEqual(
+            CachedCountPaginator(Post.objects.all(), NUM_POST).count,
+            NUM_POST)
+        with committed():
+            post = Post.objects.create(text='Новый пост', author=self.user)
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                CachedCountPaginator(Post.objects.all(), NUM_POST).count,
+                NUM_POST + 1)
+        with self.assertNumQueries(0):
+            CachedCountPaginator(Post.objects.all(), NUM_POST).count
+        with committed():
+            post.delete()
+        self.assertEqual(
+            CachedCountPaginator(Post.objects.all(), NUM_POST).count,
+            NUM_POST)
+
+    @override_settings(POSTS_APPROXIMATE_COUNT_THRESHOLD=NUM_POST // 2)
+    def test_count_above_threshold_is_estimated(self):
+        """Выше порога количество оценивается без полного подсчёта."""
+        last_post = Post.objects.latest('id')
+        self.assertEqual(
+            CachedCountPaginator(Post.objects.all(), NUM_POST).count,
+            last_post.id)
+        self.assertEqual(
+            CachedCountPaginator(
+                self.user.posts.all(), NUM_POST, estimated_count=42).count,
+            42)
+
+
+class CardCacheTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Группа карточек',
+            slug='cards-slug',
+            description='описание',
+        )
+        cls.post = Post.objects.create(
+            text='Текст карточки', author=cls.user, group=cls.group)
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_card_rendered_once(self):
+        """Повторный показ карточки берётся из кеша."""
+        hits = card_cache_stats['hits']
+        misses = card_cache_stats['misses']
+        self.client.get(reverse('posts:index'))
+        self.client.get(reverse('posts:index'))
+        self.assertEqual(card_cache_stats['misses'], misses + 1)
+        self.assertEqual(card_cache_stats['hits'], hits + 1)
+
+    def test_card_key_follows_template(self):
+        """Правка шаблона карточки меняет ключи её кеша."""
+        key = card_key(self.post)
+        self.addCleanup(card_template_version.cache_clear)
+        with mock.patch('posts.caching.get_template') as get_template:
+            get_template.return_value.template.source = '<article>'
+            card_template_version.cache_clear()
+            self.assertNotEqual(card_key(self.post), key)
+
+    def test_card_invalidated_on_post_edit(self):
+        """Редактирование поста обновляет его карточку."""
+        self.client.get(reverse('posts:index'))
+        self.authorized_client.post(
+            reverse('posts:post_edit', kwargs={'post_id': self.post.id}),
+            data={'text': 'Новый текст карточки', 'group': self.group.id},
+        )
+        response = self.client.get(reverse('posts:index'))
+        self.assertContains(response, 'Новый текст карточки')
+
+    def test_card_invalidated_on_group_rename(self):
+        """Переименование группы обновляет карточки её постов."""
+        self.client.get(reverse('posts:index'))
+        self.group.title = 'Переименованная группа'
+        self.group.save()
+        response = self.client.get(reverse('posts:index'))
+        self.assertContains(response, 'Переименованная группа')
+
+
+@override_settings(POSTS_PAGE_CACHE=True)
+class PageCacheTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Группа',
+            slug='cached-slug',
+            description='описание',
+        )
+        Post.objects.create(
+            text='Первый пост', author=cls.user, group=cls.group)
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+        self.urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile', kwargs={'username': self.user}),
+        )
+
+    def test_anonymous_pages_served_from_cache(self):
+        """Повторный запрос гостя делает только запрос для ETag."""
+        for url in self.urls:
+            with self.subTest(url=url):
+                self.client.get(url)
+                with self.assertNumQueries(1):
+                    response = self.client.get(url)
+                self.assertContains(response, 'Первый пост')
+
+    def test_new_post_shown_immediately(self):
+        """Новый пост сразу виден на главной, в группе и у автора."""
+        for url in self.urls:
+            self.client.get(url)
+        with committed():
+            Post.objects.create(
+                text='Второй пост', author=self.user, group=self.group)
+        for url in self.urls:
+            with self.subTest(url=url):
+                self.assertContains(self.client.get(url), 'Второй пост')
+
+    def test_page_cache_without_shared_cache(self):
+        """Пост, созданный без сдвига версий (другим процессом со своим
+        кешем), виден на закешированной главной."""
+        self.client.get(self.urls[0])
+        Post.objects.bulk_create(
+            [Post(text='Пост без сигналов', author=self.user)])
+        self.assertContains(self.client.get(self.urls[0]),
+                            'Пост без сигналов')
+
+    def test_versions_bumped_after_commit(self):
+        """Версии страниц сдвигаются только после фиксации транзакции."""
+        scopes = (INDEX_SCOPE, GROUP_SCOPE.format(slug=self.group.slug))
+        versions = get_versions(*scopes)
+        with committed():
+            with transaction.atomic():
+                Post.objects.create(
+                    text='Второй пост', author=self.user, group=self.group)
+                self.assertEqual(get_versions(*scopes), versions)
+        self.assertNotEqual(get_versions(*scopes), versions)
+
+    def test_version_keys_are_ascii(self):
+        """Ключи версий подходят для memcached при любых слагах."""
+        key = version_key(GROUP_SCOPE.format(slug='Тестовый слаг' * 30))
+        self.assertTrue(key.isascii())
+        self.assertNotIn(' ', key)
+        self.assertLess(len(key), 250)
+
+    def test_authorized_user_not_cached(self):
+        """Страницы авторизованного пользователя не кешируются."""
+        self.authorized_client.get(self.urls[0])
+        response = self.authorized_client.get(self.urls[0])
+        self.assertIsNotNone(response.context)
+
+
+class ConditionalGetTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.post = Post.objects.create(text='Первый пост', author=cls.user)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_unchanged_feed_not_modified(self):
+        """Неизменная лента отвечает 304 после одного запроса."""
+        url = reverse('posts:index')
+        etag = self.client.get(url)['ETag']
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+        with committed():
+            Post.objects.create(text='Второй пост', author=self.user)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_feed_etag_without_shared_cache(self):
+        """ETag ленты меняется, даже если версии кеша не сдвинуты:
+        например, пост создан процессом со своим кешем."""
+        for url in (reverse('posts:index'),
+                    reverse('posts:profile', args=(self.user.username,))):
+            with self.subTest(url=url):
+                etag = self.client.get(url)['ETag']
+                Post.objects.bulk_create(
+                    [Post(text='Пост без сигналов', author=self.user)])
+                update_post_counters({self.user.pk: 1})
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_unchanged_post_not_modified(self):
+        """Неизменный пост отвечает 304 после одного запроса."""
+        url = reverse('posts:post_detail', kwargs={'post_id': self.post.id})
+        response = self.client.get(url)
+        self.assertTrue(response.has_header('Last-Modified'))
+        etag = response['ETag']
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+        self.post.text = 'Изменённый пост'
+        self.post.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+
+class SearchViewTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.weak = Post.objects.create(
+            text='Котики и собаки гуляют во дворе', author=cls.user)
+        cls.strong = Post.objects.create(
+            text='Котики, котики и ещё раз котики', author=cls.user)
+        Post.objects.create(text='Пост про погоду', author=cls.user)
+
+    def setUp(self):
+        cache.clear()
+
+    def search(self, query):
+        response = self.client.get(reverse('posts:search'), {'q': query})
+        return list(response.context['page_obj'])
+
+    def test_search_ranks_results(self):
+        """Поиск находит посты по слову и сортирует по релевантности."""
+        self.assertEqual(self.search('котики'), [self.strong, self.weak])
+        self.assertEqual(self.search('КОТИКИ собаки'), [self.weak])
+
+    def test_fts_triggers_check(self):
+        """Проверка находит пропавший триггер поискового индекса."""
+        self.assertEqual(fts_triggers(None), [])
+        with connection.cursor() as cursor:
+            cursor.execute('DROP TRIGGER posts_post_fts_update')
+        warnings = fts_triggers(None)
+        self.assertEqual(
+            [warning.id for warning in warnings], ['posts.W001'])
+        self.assertIn('posts_post_fts_update', warnings[0].msg)
+
+    def test_fts_triggers_check_before_migration(self):
+        """Без таблицы индекса (0010 не применена) проверка молчит и
+        не мешает migrate."""
+        with connection.cursor() as cursor:
+            cursor.execute('DROP TRIGGER posts_post_fts_update')
+            cursor.execute('DROP TABLE posts_post_fts')
+        self.assertEqual(fts_triggers(None), [])
+
+    def test_search_index_follows_changes(self):
+        """Индекс поиска обновляется при изменении и удалении постов."""
+        weak = Post.objects.get(pk=self.weak.pk)
+        weak.text = 'Про погоду и дождь'
+        weak.save()
+        self.assertEqual(self.search('собаки'), [])
+        self.assertIn(weak, self.search('дождь'))
+        Post.objects.filter(pk=self.strong.pk).delete()
+        self.assertEqual(self.search('котики'), [])
+
+    def test_search_syntax_is_escaped(self):
+        """Спецсимволы запроса не ломают поиск."""
+        for query in ('"котики', 'котики OR', 'NEAR(', '*'):
+            with self.subTest(query=query):
+                response = self.client.get(
+                    reverse('posts:search'), {'q': query})
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+
+
+class SyndicationFeedTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(title='Котики', slug='cats')
+        Post.objects.bulk_create(
+            Post(text=f'Пост {index}', author=cls.user, group=cls.group)
+            for index in range(NUM_FEED + 5)
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_feeds_are_bounded(self):
+        """Ленты отдают не больше NUM_FEED последних записей."""
+        feeds = {
+            reverse('posts:index_feed'): ('<item>', 'rss'),
+            reverse('posts:group_feed', args=('cats',)): ('<item>', 'rss'),
+            reverse('posts:profile_feed', args=('auth',)): ('<item>', 'rss'),
+            reverse('posts:index_atom_feed'): ('<entry>', 'atom'),
+            reverse('posts:group_atom_feed', args=('cats',)): (
+                '<entry>', 'atom'),
+            reverse('posts:profile_atom_feed', args=('auth',)): (
+                '<entry>', 'atom'),
+        }
+        for url, (tag, feed_type) in feeds.items():
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertIn(feed_type, response['Content-Type'])
+                self.assertEqual(
+                    response.content.decode().count(tag), NUM_FEED)
+
+    def test_group_feed_unknown_group(self):
+        """Лента несуществующей группы отвечает 404."""
+        response = self.client.get(
+            reverse('posts:group_feed', args=('dogs',)))
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    def test_feed_cached_until_post_saved(self):
+        """Лента группы берётся из кеша до сохранения поста в группе."""
+        url = reverse('posts:group_feed', args=('cats',))
+        self.client.get(url)
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertNotIn('Новый пост', response.content.decode())
+        with committed():
+            Post.objects.create(
+                text='Новый пост', author=self.user, group=self.group)
+        response = self.client.get(url)
+        self.assertIn('Новый пост', response.content.decode())
+
+    def test_unchanged_feed_not_modified(self):
+        """Неизменная лента отвечает 304 по ETag."""
+        url = reverse('posts:profile_feed', args=('auth',))
+        etag = self.client.get(url)['ETag']
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+
+
+@override_settings(POSTS_WRITE_QUEUE=True, POSTS_WRITE_BATCH_WAIT=0.5)
+class WriteQueueTest(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        registry.reset()
+        self.user = User.objects.create_user(username='auth')
+        self.group = Group.objects.create(title='Группа', slug='test-slug')
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def test_create_and_edit_through_queue(self):
+        """Создание и правка поста проходят через очередь записи."""
+        response = self.client.post(
+            reverse('posts:post_create'),
+            {'text': 'Пост из очереди', 'group': self.group.pk})
+        self.assertRedirects(
+            response, reverse('posts:profile', args=(self.user.username,)))
+        post = Post.objects.get(text='Пост из очереди')
+        self.group.refresh_from_db()
+        self.assertEqual(self.group.post_count, 1)
+        self.client.post(reverse('posts:post_edit', args=(post.pk,)),
+                         {'text': 'Правка из очереди'})
+        post.refresh_from_db()
+        self.assertEqual(post.text, 'Правка из очереди')
+        self.assertIsNone(post.group)
+        self.assertEqual(registry.writes['posts', 'ok'], 2)
+
+    def test_group_commit(self):
+        """Пачка сохраняется одной транзакцией, а ошибка одного поста
+        не мешает остальным."""
+        futures = [writer.submit(Post(text=f'Пост {index}', author=self.user))
+                   for index in range(4)]
+        futures.append(writer.submit(Post(text='Без автора')))
+        for future in futures[:4]:
+            self.assertIsNotNone(future.result(5).pk)
+        with self.assertRaises(IntegrityError):
+            futures[4].result(5)
+        self.assertEqual(Post.objects.count(), 4)
+        self.assertEqual(sum(registry.commits['posts'][:-1]), 1)
+        self.assertEqual(registry.writes['posts', 'error'], 1)
+
+    @override_settings(POSTS_WRITE_TIMEOUT=0)
+    def test_timeout_keeps_post_queued(self):
+        """Если очередь не успела, запрос всё равно принят, а пост
+        сохраняется позже ровно один раз."""
+        release = threading.Event()
+
+        def slow_save(post):
+            release.wait(5)
+            return save(post)
+
+        with mock.patch('posts.writer.save', slow_save):
+            response = self.client.post(
+                reverse('posts:post_create'), {'text': 'Медленный пост'})
+            self.assertRedirects(response, reverse(
+                'posts:profile', args=(self.user.username,)))
+            self.assertFalse(Post.objects.exists())
+            release.set()
+            for _ in range(100):
+                if Post.objects.exists():
+                    break
+                time.sleep(0.05)
+        self.assertEqual(
+            list(Post.objects.values_list('text', flat=True)),
+            ['Медленный пост'])
@@ -0,0 +1,18 @@
+from contextlib import contextmanager
+
+from django.db import connection
+
+
+@contextmanager
+def committed():
+    """Выполняет on_commit-колбэки, отложенные в блоке.
+
+    TestCase не фиксирует транзакцию, поэтому без этого сдвиги версий
+    кеша из сигналов до теста не дойдут.
+    """
+    start = len(connection.run_on_commit)
+    yield
+    callbacks = connection.run_on_commit[start:]
+    del connection.run_on_commit[start:]
+    for _, callback in callbacks:
+        callback()
@@ -1,14 +1,24 @@
 from django.urls import path
 
-from . import views
+from . import feeds, views
 
 app_name = 'posts'
 
 urlpatterns = [
     path('', views.index, name='index'),
+    path('feed/', feeds.index_feed, name='index_feed'),
+    path('feed/atom/', feeds.index_atom_feed, name='index_atom_feed'),
     path('group/<slug:slug>/', views.group_posts, name='group_list'),
+    path('group/<slug:slug>/feed/', feeds.group_feed, name='group_feed'),
+    path('group/<slug:slug>/feed/atom/', feeds.group_atom_feed,
+         name='group_atom_feed'),
+    path('search/', views.search, name='search'),
     path('create/', views.post_create, name='post_create'),
     path('profile/<str:username>/', views.profile, name='profile'),
+    path('profile/<str:username>/feed/', feeds.profile_feed,
+         name='profile_feed'),
+    path('profile/<str:username>/feed/atom/', feeds.profile_atom_feed,
+         name='profile_atom_feed'),
     path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
     path('posts/<int:post_id>/edit/', views.post_edit, name='post_edit'),
 ]
@@ -1,24 +1,37 @@
-from django.core.paginator import Paginator
 from django.contrib.auth import get_user_model
 from django.contrib.auth.decorators import login_required
+from django.utils.http import urlencode
 from django.shortcuts import render, get_object_or_404, redirect
+from django.views.decorators.http import condition
 
+from .caching import (AUTHOR_SCOPE, GROUP_SCOPE, INDEX_SCOPE,
+                      cache_anonymous_page, feed_etag, post_etag,
+                      post_last_modified)
 from .models import Post, Group
 from .forms import PostForm
+from .paginators import FeedPaginator, WindowedPaginator
+from .search import search_posts
+from .writer import save_post
 
 POSTS_PER_PAGE = 10
 User = get_user_model()
 
 
-def paginator(request, posts):
-    paginator = Paginator(posts, POSTS_PER_PAGE)
+def paginator(request, posts, estimated_count=None):
+    paginator = FeedPaginator(posts, POSTS_PER_PAGE,
+                              estimated_count=estimated_count)
+    cursor = request.GET.get('cursor')
+    if cursor:
+        return paginator.get_cursor_page(cursor)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     return page_obj
 
 
+@condition(etag_func=feed_etag(INDEX_SCOPE))
+@cache_anonymous_page(INDEX_SCOPE)
 def index(request):
-    post_list = Post.objects.all()
+    post_list = Post.objects.for_feed()
     page_obj = paginator(request, post_list)
     template = 'posts/index.html'
     context = {
@@ -27,10 +40,12 @@ def index(request):
     return render(request, template, context)
 
 
+@condition(etag_func=feed_etag(GROUP_SCOPE))
+@cache_anonymous_page(GROUP_SCOPE)
 def group_posts(request, slug):
     group = get_object_or_404(Group, slug=slug)
-    post_list = group.posts.all()
-    page_obj = paginator(request, post_list)
+    post_list = group.posts.for_feed()
+    page_obj = paginator(request, post_list, group.post_count)
     template = 'posts/group_list.html'
     context = {
         'group': group,
@@ -39,10 +54,15 @@ def group_posts(request, slug):
     return render(request, template, context)
 
 
+@condition(etag_func=feed_etag(AUTHOR_SCOPE))
+@cache_anonymous_page(AUTHOR_SCOPE)
 def profile(request, username):
-    author = get_object_or_404(User, username=username)
-    post_list = author.posts.all()
-    page_obj = paginator(request, post_list)
+    author = get_object_or_404(
+        User.objects.select_related('stats'), username=username)
+    post_list = author.posts.for_feed()
+    stats = getattr(author, 'stats', None)
+    page_obj = paginator(
+        request, post_list, stats.post_count if stats else None)
     template = 'posts/profile.html'
     context = {
         'author': author,
@@ -51,8 +71,24 @@ def profile(request, username):
     return render(request, template, context)
 
 
+def search(request):
+    query = request.GET.get('q', '').strip()
+    results = search_posts(query) if query else Post.objects.none()
+    page_obj = WindowedPaginator(results, POSTS_PER_PAGE).get_page(
+        request.GET.get('page'))
+    template = 'posts/search.html'
+    context = {
+        'query': query,
+        'page_obj': page_obj,
+        'page_query': urlencode({'q': query}) + '&',
+    }
+    return render(request, template, context)
+
+
+@condition(etag_func=post_etag, last_modified_func=post_last_modified)
 def post_detail(request, post_id):
-    post = get_object_or_404(Post, id=post_id)
+    post = get_object_or_404(
+        Post.objects.select_related('author__stats', 'group'), id=post_id)
     template = 'posts/post_detail.html'
     context = {
         'post': post,
@@ -66,7 +102,7 @@ def post_create(request):
     if form.is_valid():
         post_create = form.save(commit=False)
         post_create.author = request.user
-        post_create.save()
+        save_post(post_create)
         return redirect('posts:profile', post_create.author)
     template = 'posts/post_create.html'
     context = {'form': form}
@@ -80,7 +116,7 @@ def post_edit(request, post_id):
         return redirect('posts:post_detail', post_id)
     form = PostForm(request.POST or None, instance=post_edit)
     if form.is_valid():
-        form.save()
+        save_post(form.save(commit=False))
         return redirect('posts:post_detail', post_id)
     template = 'posts/post_create.html'
     context = {'form': form, 'is_edit': True, 'post_id': post_id}
@@ -0,0 +1,142 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+
+from core.metrics import registry
+
+WRITER = 'posts'
+QUEUE_DEPTH = 'yatube_write_queue_depth'
+
+logger = logging.getLogger('yatube.writer')
+
+
+@contextmanager
+def file_lock(path):
+    """Эксклюзивная блокировка файла: один пишущий на все процессы."""
+    if not path:
+        yield
+        return
+    import fcntl
+    with open(path, 'a') as file:
+        fcntl.flock(file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(file, fcntl.LOCK_UN)
+
+
+class PostWriter:
+    """Очередь записи постов с одним пишущим потоком на процесс.
+
+    Поток забирает задания пачками до POSTS_WRITE_BATCH штук, ожидая
+    следующее не дольше POSTS_WRITE_BATCH_WAIT секунд, и сохраняет всю
+    пачку одной транзакцией. Ошибка одного поста откатывает только его
+    точку сохранения; результат каждого задания возвращается через Future
+    после фиксации транзакции. Версии кеша, которые сдвигают сигналы
+    post_save, сдвигаются тоже после фиксации пачки (on_commit).
+    """
+
+    def __init__(self):
+        self.queue = queue.Queue()
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def submit(self, post):
+        future = Future()
+        self.start()
+        self.queue.put((post, future))
+        registry.set_gauge(QUEUE_DEPTH, WRITER, self.queue.qsize())
+        return future
+
+    def start(self):
+        # Потоки не переживают fork, поэтому живость проверяется каждый раз.
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(
+                    target=self.run, name='post-writer', daemon=True)
+                self.thread.start()
+
+    def run(self):
+        while True:
+            self.commit(self.take())
+
+    def take(self):
+        batch = [self.queue.get()]
+        deadline = time.monotonic() + settings.POSTS_WRITE_BATCH_WAIT
+        while len(batch) < settings.POSTS_WRITE_BATCH:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(self.queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+        return batch
+
+    def commit(self, batch):
+        close_old_connections()
+        started = time.perf_counter()
+        results = []
+        try:
+            with file_lock(settings.POSTS_WRITE_LOCK_FILE):
+                with transaction.atomic():
+                    for post, future in batch:
+                        results.append((future, post, save(post)))
+        except Exception as error:
+            results = [(future, post, error) for post, future in batch]
+        failed = 0
+        for future, post, error in results:
+            if error is None:
+                future.set_result(post)
+            else:
+                failed += 1
+                future.set_exception(error)
+        registry.observe_commit(WRITER, time.perf_counter() - started,
+                                len(batch) - failed, failed)
+        registry.set_gauge(QUEUE_DEPTH, WRITER, self.queue.qsize())
+
+
+def save(post):
+    try:
+        with transaction.atomic():
+            post.save()
+    except Exception as error:
+        return error
+    return None
+
+
+writer = PostWriter()
+
+
+def log_failure(future):
+    if future.exception() is not None:
+        logger.error('Отложенное сохранение поста не удалось',
+                     exc_info=future.exception())
+
+
+def save_post(post):
+    """Сохраняет пост через очередь записи, если включена настройка
+    POSTS_WRITE_QUEUE. Внутри транзакции вызывающего пост сохраняется
+    сразу: иначе он не попал бы в эту транзакцию.
+
+    Возвращает сохранённый пост или None, если за POSTS_WRITE_TIMEOUT
+    секунд очередь до него не дошла. Задание при этом не отменяется и
+    будет сохранено позже, поэтому запрос считается принятым: ошибка
+    в ответ привела бы к повторной отправке и дубликату поста. Если
+    отложенное сохранение не удастся, ошибка пишется в лог yatube.writer.
+    """
+    if not settings.POSTS_WRITE_QUEUE or connection.in_atomic_block:
+        post.save()
+        return post
+    future = writer.submit(post)
+    try:
+        return future.result(settings.POSTS_WRITE_TIMEOUT)
+    except TimeoutError:
+        future.add_done_callback(log_failure)
+        return None
@@ -29,10 +29,15 @@ INSTALLED_APPS = [
     'users.apps.UsersConfig',
     'core.apps.CoreConfig',
     'about.apps.AboutConfig',
+    'api.apps.ApiConfig',
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.StaticFilesMiddleware',
+    'core.middleware.ProfilingMiddleware',
+    'core.middleware.MetricsMiddleware',
+    'core.middleware.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -41,6 +46,44 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Профилирование запросов: заголовок Server-Timing и строка в логе
+# yatube.profiling. Выключенное не добавляет накладных расходов.
+PROFILING = False
+
+# Предупреждать при запуске о накладных расходах отладочного режима.
+PERFORMANCE_CHECKS = False
+
+# Метрики по представлениям на /metrics. При нескольких процессах каждый
+# пишет снимок в METRICS_DIR не чаще METRICS_FLUSH_INTERVAL секунд,
+# а /metrics суммирует все снимки. Если задан METRICS_TOKEN, /metrics
+# отвечает только на запросы с заголовком «Authorization: Bearer <токен>».
+METRICS = False
+METRICS_TOKEN = None
+METRICS_DIR = None
+METRICS_FLUSH_INTERVAL = 5
+
+# Сжатие ответов по Accept-Encoding (br — если установлен пакет brotli)
+# и удаление лишних пробелов из HTML. Ответы меньше MIN_SIZE байт не
+# сжимаются; LEVEL — уровень gzip (1-9) и качество brotli (0-11).
+# Ответы с CSRF-токеном не сжимаются никогда (BREACH). Сжатие обычно
+# делает прокси, поэтому оно включается явно.
+RESPONSE_COMPRESSION = False
+RESPONSE_MINIFY_HTML = True
+RESPONSE_COMPRESSION_MIN_SIZE = 512
+RESPONSE_COMPRESSION_LEVEL = {'gzip': 6, 'br': 5}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'yatube.profiling': {'handlers': ['console'], 'level': 'INFO'},
+        'yatube.writer': {'handlers': ['console'], 'level': 'ERROR'},
+    },
+}
+
 ROOT_URLCONF = 'yatube.urls'
 
 TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
@@ -74,6 +117,9 @@ DATABASES = {
     }
 }
 
+# PRAGMA, которые выполняются на каждом новом соединении с SQLite.
+SQLITE_PRAGMAS = {}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
@@ -115,6 +161,46 @@ STATIC_URL = '/static/'
 
 STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
 
+# Отдавать собранную статику из STATIC_ROOT middleware-ом, без
+# отдельного веб-сервера. Ожидает collectstatic с
+# core.storage.CompressedManifestStaticFilesStorage.
+STATIC_SERVE = False
+
+# Классы, которых нет в шаблонах, но которые появляются на странице
+# динамически (скрипты Bootstrap, состояния форм). manage.py prune_css
+# сохраняет их стили в css/bootstrap.pruned.min.css.
+PRUNE_CSS_ALLOWLIST = [
+    'active', 'collapse', 'collapsing', 'disabled', 'fade', 'show',
+    'is-invalid', 'is-valid', 'was-validated',
+]
+
+# Кеш COUNT(*) для пагинации лент: время жизни в секундах и порог,
+# выше которого вместо точного подсчёта используется оценка.
+POSTS_COUNT_CACHE_TIMEOUT = 60
+POSTS_APPROXIMATE_COUNT_THRESHOLD = 10000
+
+# Время жизни отрендеренных карточек постов в кеше, в секундах.
+POSTS_CARD_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Кеш страниц лент для анонимных посетителей. Сбрасывается версиями,
+# поэтому при нескольких процессах нужен общий бэкенд кеша.
+POSTS_PAGE_CACHE = False
+POSTS_PAGE_CACHE_TIMEOUT = 60 * 60
+# Кеш RSS/Atom-лент: так же сбрасывается версиями при сохранении постов.
+POSTS_FEED_CACHE = True
+
+# Очередь записи постов: один пишущий поток на процесс сохраняет посты
+# пачками до POSTS_WRITE_BATCH штук одной транзакцией. С
+# POSTS_WRITE_LOCK_FILE пишущие потоки процессов по очереди берут
+# блокировку этого файла. POSTS_WRITE_TIMEOUT — сколько секунд запрос
+# ждёт результата; по истечении пост остаётся в очереди и считается
+# принятым.
+POSTS_WRITE_QUEUE = False
+POSTS_WRITE_BATCH = 50
+POSTS_WRITE_BATCH_WAIT = 0.005
+POSTS_WRITE_LOCK_FILE = None
+POSTS_WRITE_TIMEOUT = 10
+
 LOGIN_URL = 'users:login'
 LOGIN_REDIRECT_URL = 'posts:index'
 # LOGOUT_REDIRECT_URL = 'posts:index'
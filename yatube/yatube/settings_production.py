@@ -0,0 +1,87 @@
+"""Настройки для боевого запуска, значения берутся из окружения.
+
+DJANGO_SETTINGS_MODULE=yatube.settings_production
+"""
+import os
+from copy import deepcopy
+
+from .settings import *  # noqa: F401,F403
+from .settings import BASE_DIR, DATABASES, TEMPLATES
+
+
+def env_bool(name, default=False):
+    return os.environ.get(name, str(default)).lower() in ('1', 'true', 'yes')
+
+
+def env_int(name, default):
+    return int(os.environ.get(name, default))
+
+
+SECRET_KEY = os.environ['YATUBE_SECRET_KEY']
+
+DEBUG = env_bool('YATUBE_DEBUG')
+
+ALLOWED_HOSTS = [
+    host.strip()
+    for host in os.environ.get('YATUBE_ALLOWED_HOSTS', '').split(',')
+    if host.strip()
+]
+
+DATABASES = deepcopy(DATABASES)
+DATABASES['default'].update({
+    'NAME': os.environ.get(
+        'YATUBE_DB_PATH', os.path.join(BASE_DIR, 'db.sqlite3')),
+    # Соединение живёт между запросами, а не открывается на каждый.
+    'CONN_MAX_AGE': env_int('YATUBE_CONN_MAX_AGE', 600),
+})
+
+SQLITE_PRAGMAS = {
+    # WAL: читатели не блокируют писателя и друг друга.
+    'journal_mode': 'WAL',
+    'synchronous': os.environ.get('YATUBE_SQLITE_SYNCHRONOUS', 'NORMAL'),
+    'mmap_size': env_int('YATUBE_SQLITE_MMAP_SIZE', 256 * 1024 * 1024),
+    # Отрицательное значение — размер в КиБ, а не в страницах.
+    'cache_size': env_int('YATUBE_SQLITE_CACHE_SIZE', -64 * 1024),
+    'busy_timeout': env_int('YATUBE_SQLITE_BUSY_TIMEOUT', 5000),
+}
+
+# Шаблоны компилируются один раз на процесс.
+TEMPLATES = deepcopy(TEMPLATES)
+TEMPLATES[0]['APP_DIRS'] = False
+TEMPLATES[0]['OPTIONS'].update({
+    'debug': DEBUG,
+    'loaders': [
+        ('django.template.loaders.cached.Loader', [
+            'django.template.loaders.filesystem.Loader',
+            'django.template.loaders.app_directories.Loader',
+        ]),
+    ],
+})
+
+STATIC_ROOT = os.environ.get(
+    'YATUBE_STATIC_ROOT', os.path.join(BASE_DIR, 'static_root'))
+# Имена с хешем содержимого и сжатые копии; collectstatic обязателен.
+STATICFILES_STORAGE = 'core.storage.CompressedManifestStaticFilesStorage'
+STATIC_SERVE = env_bool('YATUBE_STATIC_SERVE', True)
+
+# Версии кеша лент должны быть общими для всех процессов; без
+# YATUBE_CACHE_LOCATION остаётся LocMem, об этом предупреждает core.W004.
+if os.environ.get('YATUBE_CACHE_LOCATION'):
+    CACHES = {
+        'default': {
+            'BACKEND': os.environ.get(
+                'YATUBE_CACHE_BACKEND',
+                'django.core.cache.backends.filebased.FileBasedCache'),
+            'LOCATION': os.environ['YATUBE_CACHE_LOCATION'],
+        }
+    }
+
+RESPONSE_COMPRESSION = env_bool('YATUBE_RESPONSE_COMPRESSION')
+
+METRICS = env_bool('YATUBE_METRICS')
+METRICS_TOKEN = os.environ.get('YATUBE_METRICS_TOKEN')
+METRICS_DIR = os.environ.get('YATUBE_METRICS_DIR')
+
+PROFILING = env_bool('YATUBE_PROFILING')
+
+PERFORMANCE_CHECKS = True